@@ -1,21 +1,41 @@
 import argparse
-import glob
+import heapq
 import os
 import re
 import socket
+import struct
 import subprocess
 import sys
 import threading
 import time
+from collections import deque
 from datetime import datetime
+from itertools import islice
+
+from multiprocessing import shared_memory
 
 import cv2
 import numpy as np
 
 class FrameBuffer:
-    """Thread-safe buffer for sharing the latest frame between detection and web threads."""
+    """Thread-safe buffer for sharing the latest frame between detection and web threads.
+
+    Only the frame payload and its timestamp are guarded by the lock, since they
+    must change together. Every other field is a single reference, and
+    rebinding a reference is atomic under the GIL, so those accessors skip the lock.
+    """
+
+    __slots__ = (
+        "_lock", "_frame_bytes", "_last_motion_time", "_last_frame_time",
+        "_last_read_time", "_roi", "_audio_level", "_last_sound_time",
+        "_audio_enabled", "_motion_alerts_enabled", "_sound_alerts_enabled",
+        "_sensitivity", "_fps", "_frame_ready", "_generation",
+    )
+
     def __init__(self):
         self._lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._lock)
+        self._generation = 0
         self._frame_bytes = None
         self._last_motion_time = None
         self._last_frame_time = None
@@ -30,95 +50,101 @@ class FrameBuffer:
         self._fps = 10
 
     def update(self, frame_bytes):
+        """Store the latest JPEG — bytes, or the ndarray from cv2.imencode as-is."""
+        if isinstance(frame_bytes, np.ndarray):
+            frame_bytes = frame_bytes.reshape(-1)
         with self._lock:
             self._frame_bytes = frame_bytes
             self._last_frame_time = time.time()
+            self._generation += 1
+            self._frame_ready.notify_all()
 
     def get(self):
+        """Return the latest JPEG as bytes, or a zero-copy memoryview for encoded arrays."""
         with self._lock:
             self._last_read_time = time.monotonic()
-            return self._frame_bytes
+            frame_bytes = self._frame_bytes
+        return _frame_view(frame_bytes)
+
+    def wait_frame(self, last_generation, timeout=1.0):
+        """Block until a frame newer than last_generation arrives, or timeout.
+
+        Returns (generation, frame); generation equals last_generation on timeout.
+        """
+        with self._frame_ready:
+            self._frame_ready.wait_for(lambda: self._generation != last_generation, timeout)
+            self._last_read_time = time.monotonic()
+            generation, frame_bytes = self._generation, self._frame_bytes
+        return generation, _frame_view(frame_bytes)
 
     def has_viewers(self):
-        with self._lock:
-            return (self._last_read_time is not None
-                    and (time.monotonic() - self._last_read_time) < 5.0)
+        last_read = self._last_read_time
+        return last_read is not None and (time.monotonic() - last_read) < 5.0
 
     def set_last_motion_time(self, t):
-        with self._lock:
-            self._last_motion_time = t
+        self._last_motion_time = t
 
     def get_last_motion_time(self):
-        with self._lock:
-            return self._last_motion_time
+        return self._last_motion_time
 
     def get_last_frame_time(self):
         with self._lock:
             return self._last_frame_time
 
     def set_roi(self, roi):
-        with self._lock:
-            self._roi = roi
+        self._roi = roi
 
     def get_roi(self):
-        with self._lock:
-            return self._roi
+        return self._roi
 
     def set_audio_level(self, level):
-        with self._lock:
-            self._audio_level = level
+        self._audio_level = level
 
     def get_audio_level(self):
-        with self._lock:
-            return self._audio_level
+        return self._audio_level
 
     def set_last_sound_time(self, t):
-        with self._lock:
-            self._last_sound_time = t
+        self._last_sound_time = t
 
     def get_last_sound_time(self):
-        with self._lock:
-            return self._last_sound_time
+        return self._last_sound_time
 
     def set_audio_enabled(self, enabled):
-        with self._lock:
-            self._audio_enabled = enabled
+        self._audio_enabled = enabled
 
     def get_audio_enabled(self):
-        with self._lock:
-            return self._audio_enabled
+        return self._audio_enabled
 
     def set_motion_alerts_enabled(self, enabled):
-        with self._lock:
-            self._motion_alerts_enabled = enabled
+        self._motion_alerts_enabled = enabled
 
     def get_motion_alerts_enabled(self):
-        with self._lock:
-            return self._motion_alerts_enabled
+        return self._motion_alerts_enabled
 
     def set_sound_alerts_enabled(self, enabled):
-        with self._lock:
-            self._sound_alerts_enabled = enabled
+        self._sound_alerts_enabled = enabled
 
     def get_sound_alerts_enabled(self):
-        with self._lock:
-            return self._sound_alerts_enabled
+        return self._sound_alerts_enabled
 
     def set_sensitivity(self, sensitivity):
-        with self._lock:
-            self._sensitivity = sensitivity
+        self._sensitivity = sensitivity
 
     def get_sensitivity(self):
-        with self._lock:
-            return self._sensitivity
+        return self._sensitivity
 
     def set_fps(self, fps):
-        with self._lock:
-            self._fps = fps
+        self._fps = fps
 
     def get_fps(self):
-        with self._lock:
-            return self._fps
+        return self._fps
+
+
+def _frame_view(frame_bytes):
+    """Expose an encoded ndarray as a zero-copy memoryview; pass bytes/None through."""
+    if isinstance(frame_bytes, np.ndarray):
+        return memoryview(frame_bytes)
+    return frame_bytes
 
 
 frame_buffer = FrameBuffer()
@@ -129,6 +155,16 @@ SENSITIVITY_THRESHOLDS = {
     "high": 500,
 }
 
+# Per-pixel intensity change that counts as movement in detect_motion
+PIXEL_DIFF_THRESHOLD = 25
+
+# Frames wider than this are downsampled before diffing; motion doesn't need full resolution
+MOTION_MAX_WIDTH = 320
+
+# Shared frame block layout: front index, height, width, channels, then two frame buffers
+SHM_HEADER_FORMAT = "4i"
+SHM_HEADER_SIZE = struct.calcsize(SHM_HEADER_FORMAT)
+
 
 def mask_credentials(url):
     """Mask username:password in a URL for safe logging."""
@@ -140,9 +176,15 @@ class ThreadedVideoCapture:
 
     Prevents RTSP/network stream lag by continuously reading frames and
     always providing the latest one to the caller.
+
+    If shm_name is given, frames are also published to a named shared memory
+    block (double-buffered) so other processes can read them with
+    SharedFrameReader without pickling.
     """
 
-    def __init__(self, source, rtsp_transport="tcp"):
+    _join_timeout = 2.0
+
+    def __init__(self, source, rtsp_transport="tcp", shm_name=None):
         if isinstance(source, str) and source.startswith("rtsp://"):
             os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = f"rtsp_transport;{rtsp_transport}"
         self._cap = cv2.VideoCapture(source)
@@ -151,17 +193,67 @@ class ThreadedVideoCapture:
         self._frame = None
         self._stopped = False
         self._last_frame_time = None
+        self._shm_name = shm_name
+        self._shm = None
+        self._shm_buffers = None
+        self._front = 0
         self._thread = threading.Thread(target=self._reader, daemon=True)
         self._thread.start()
 
     def _reader(self):
-        while not self._stopped:
-            ret, frame = self._cap.read()
-            with self._lock:
-                self._ret = ret
-                self._frame = frame
-                if ret:
-                    self._last_frame_time = time.monotonic()
+        try:
+            while not self._stopped:
+                ret, frame = self._cap.read()
+                with self._lock:
+                    # release() stops waiting if read() blocks, so check again before publishing
+                    if self._stopped:
+                        break
+                    if ret and self._shm_name is not None:
+                        shared = self._publish_shared(frame)
+                        if shared is not None:
+                            frame = shared
+                            self._front = 1 - self._front
+                            struct.pack_into(SHM_HEADER_FORMAT, self._shm.buf, 0, self._front, *frame.shape)
+                    self._ret = ret
+                    self._frame = frame
+                    if ret:
+                        self._last_frame_time = time.monotonic()
+        finally:
+            # The reader is the block's only writer, so it unlinks it once it can no longer publish
+            self._close_shared()
+
+    def _publish_shared(self, frame):
+        """Copy frame into the back buffer of the shared block and return that view.
+
+        Returns None if the frame was not published. Caller must hold the lock.
+        """
+        if self._shm is None:
+            if frame.ndim != 3 or frame.dtype != np.uint8:
+                return None
+            self._shm = shared_memory.SharedMemory(
+                name=self._shm_name, create=True, size=SHM_HEADER_SIZE + 2 * frame.nbytes
+            )
+            self._shm_buffers = _shared_frame_views(self._shm, frame.shape)
+            # Header is written last, so readers never see a shape before the buffers exist
+            self._front = 1
+        back = self._shm_buffers[1 - self._front]
+        if frame.shape != back.shape or frame.dtype != back.dtype:
+            # Readers have mapped the block at the old size; keep its last frame and stop publishing
+            print(f"Warning: Camera frame size changed to {frame.shape}; no longer sharing frames")
+            self._shm_name = None
+            return None
+        np.copyto(back, frame)
+        return back
+
+    def _close_shared(self):
+        with self._lock:
+            shm, self._shm = self._shm, None
+            if shm is None:
+                return
+            self._frame = None
+            self._shm_buffers = None
+        shm.close()
+        shm.unlink()
 
     def read(self):
         with self._lock:
@@ -172,8 +264,13 @@ class ThreadedVideoCapture:
         return self._cap.isOpened()
 
     def release(self):
+        """Stop the reader thread and release the camera.
+
+        If a blocked read() outlasts the join timeout, the reader thread removes
+        the shared block itself once that read returns.
+        """
         self._stopped = True
-        self._thread.join(timeout=2.0)
+        self._thread.join(timeout=self._join_timeout)
         self._cap.release()
 
     def get(self, prop):
@@ -189,6 +286,39 @@ class ThreadedVideoCapture:
             return (time.monotonic() - self._last_frame_time) < timeout
 
 
+def _shared_frame_views(shm, shape):
+    """Return the two uint8 frame buffers of a shared block as ndarray views."""
+    nbytes = int(np.prod(shape))
+    return [
+        np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=SHM_HEADER_SIZE + i * nbytes)
+        for i in range(2)
+    ]
+
+
+class SharedFrameReader:
+    """Reads frames published by ThreadedVideoCapture(shm_name=...) from another process.
+
+    read() returns a zero-copy view of the latest frame. The view is only valid
+    until the producer has written two more frames; copy it if it must be kept.
+    """
+
+    def __init__(self, shm_name):
+        self._shm = shared_memory.SharedMemory(name=shm_name)
+        self._buffers = None
+
+    def read(self):
+        front, h, w, c = struct.unpack_from(SHM_HEADER_FORMAT, self._shm.buf, 0)
+        if h == 0:
+            return False, None
+        if self._buffers is None:
+            self._buffers = _shared_frame_views(self._shm, (h, w, c))
+        return True, self._buffers[front]
+
+    def close(self):
+        self._buffers = None
+        self._shm.close()
+
+
 def _is_network_source(source):
     """Check if a camera source string is a network URL."""
     return isinstance(source, str) and (
@@ -224,7 +354,7 @@ def open_camera_source(source, rtsp_transport="tcp"):
     return cap
 
 
-def parse_args():
+def _build_parser():
     parser = argparse.ArgumentParser(description="BabyPing — lightweight baby monitor with motion detection")
     parser.add_argument("--camera", type=str, default="0",
                         help="Camera index or RTSP/HTTP URL (default: 0)")
@@ -260,17 +390,41 @@ def parse_args():
                         help="Audio threshold (0-1), omit for auto-calibration")
     parser.add_argument("--max-events", type=int, default=1000,
                         help="Max events to keep in log, 0=unlimited (default: 1000)")
-    return parser.parse_args()
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+def parse_args(argv=None):
+    """Parse CLI arguments (argv excludes the program name; defaults to sys.argv[1:])."""
+    return _PARSER.parse_args(argv)
 
 
 def detect_motion(prev_gray, curr_gray, threshold):
-    """Detect motion by frame-diffing. Returns (motion_detected, contours, total_area)."""
-    diff = cv2.absdiff(prev_gray, curr_gray)
-    _, thresh = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
-    thresh = cv2.dilate(thresh, None, iterations=2)
-    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    """Detect motion by frame-diffing. Returns (motion_detected, contours, total_area).
+
+    Wide frames are diffed at MOTION_MAX_WIDTH; contours and area are scaled back
+    to the input resolution, so callers and thresholds see full-size units.
+    """
+    width = curr_gray.shape[1]
+    scale = MOTION_MAX_WIDTH / width if width > MOTION_MAX_WIDTH else None
+    if scale is not None:
+        prev_gray = cv2.resize(prev_gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        curr_gray = cv2.resize(curr_gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    if cv2.norm(prev_gray, curr_gray, cv2.NORM_INF) <= PIXEL_DIFF_THRESHOLD:
+        # No pixel changed enough to survive the threshold — skip diff, dilation and contours
+        return False, (), 0
+    # Threshold and dilate reuse the diff buffer, so the whole pass allocates one image
+    mask = cv2.absdiff(prev_gray, curr_gray)
+    cv2.threshold(mask, PIXEL_DIFF_THRESHOLD, 255, cv2.THRESH_BINARY, dst=mask)
+    cv2.dilate(mask, None, dst=mask, iterations=2)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
     total_area = sum(cv2.contourArea(c) for c in contours)
+    if scale is not None:
+        contours = [(c / scale).astype(np.int32) for c in contours]
+        total_area /= scale * scale
     return total_area >= threshold, contours, total_area
 
 
@@ -283,12 +437,18 @@ def send_notification(title, message):
     ], capture_output=True)
 
 
+# Each open /stream holds a waitress worker for as long as the viewer stays, so leave
+# plenty of threads for /status and /events polls; idle workers only cost a stack
+WEB_SERVER_THREADS = 16
+
+
 def start_web_server(flask_app, host, port):
     """Create and return a daemon thread running the web server."""
     try:
         from waitress import serve as waitress_serve
         thread = threading.Thread(
-            target=lambda: waitress_serve(flask_app, host=host, port=port, threads=4, _quiet=True),
+            target=lambda: waitress_serve(flask_app, host=host, port=port,
+                                          threads=WEB_SERVER_THREADS, _quiet=True),
             daemon=True
         )
     except ImportError:
@@ -299,6 +459,63 @@ def start_web_server(flask_app, host, port):
     return thread
 
 
+def _snapshot_names(snapshot_dir):
+    """Return the snapshot filenames in snapshot_dir, skipping dotfiles as glob("*.jpg") does."""
+    with os.scandir(snapshot_dir) as it:
+        return [e.name for e in it if e.name.endswith(".jpg") and not e.name.startswith(".")]
+
+
+class SnapshotRotator:
+    """Tracks the snapshots in one directory, oldest first, and deletes past the cap.
+
+    The directory is scanned once when the rotator is created; after that each
+    save only appends its own path, so rotation never re-lists the directory.
+    """
+
+    def __init__(self, snapshot_dir, max_snapshots):
+        self.max_snapshots = max_snapshots
+        # Filenames are timestamps, so sorting by name orders them oldest first
+        names = sorted(_snapshot_names(snapshot_dir))
+        self._paths = deque(os.path.join(snapshot_dir, name) for name in names)
+
+    def add(self, path):
+        """Record a newly saved snapshot and delete the oldest ones over the cap."""
+        # Two saves within the same second overwrite the same file
+        if not self._paths or self._paths[-1] != path:
+            self._paths.append(path)
+        while len(self._paths) > self.max_snapshots:
+            try:
+                os.remove(self._paths.popleft())
+            except FileNotFoundError:
+                pass
+
+    def newest(self, limit):
+        """Return up to limit tracked snapshot filenames, newest first."""
+        # list() copies in one C call, so a concurrent add() can't mutate the deque mid-iteration
+        return [os.path.basename(p) for p in list(islice(reversed(self._paths), limit))]
+
+
+_snapshot_rotators = {}
+
+
+def list_snapshots(snapshot_dir, limit=20):
+    """Return up to limit snapshot filenames in snapshot_dir, newest first.
+
+    When this process saves to the directory, the rotator already tracks its
+    files, so the listing comes from memory; otherwise the directory is scanned.
+    """
+    snapshot_dir = os.path.expanduser(snapshot_dir)
+    for (directory, _), rotator in list(_snapshot_rotators.items()):
+        if directory == snapshot_dir:
+            return rotator.newest(limit)
+    try:
+        names = _snapshot_names(snapshot_dir)
+    except OSError:
+        return []
+    # Filenames are timestamps; nlargest avoids sorting the whole directory for one page
+    return heapq.nlargest(limit, names)
+
+
 def save_snapshot(frame, snapshot_dir="~/.babyping/events", max_snapshots=100):
     """Save a frame as a JPEG snapshot. Returns the file path, or None on failure."""
     try:
@@ -307,17 +524,22 @@ def save_snapshot(frame, snapshot_dir="~/.babyping/events", max_snapshots=100):
 
         timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
         filepath = os.path.join(snapshot_dir, f"{timestamp}.jpg")
-        success = cv2.imwrite(filepath, frame)
+        success, jpeg = cv2.imencode(".jpg", frame)
         if not success:
             return None
 
         if max_snapshots > 0:
-            files = sorted(glob.glob(os.path.join(snapshot_dir, "*.jpg")))
-            while len(files) > max_snapshots:
-                try:
-                    os.remove(files.pop(0))
-                except FileNotFoundError:
-                    pass
+            key = (snapshot_dir, max_snapshots)
+            rotator = _snapshot_rotators.get(key)
+            if rotator is None:
+                # Seed from disk before writing, so the new file is added exactly once
+                rotator = _snapshot_rotators[key] = SnapshotRotator(snapshot_dir, max_snapshots)
+
+        with open(filepath, "wb") as f:
+            f.write(jpeg)
+
+        if max_snapshots > 0:
+            rotator.add(filepath)
 
         return filepath
     except OSError:
@@ -330,10 +552,10 @@ _clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
 def apply_night_mode(frame):
     """Enhance frame brightness/contrast for dark rooms using CLAHE."""
     lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
-    l = _clahe.apply(l)
-    enhanced = cv2.merge([l, a, b])
-    return cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+    # Only L changes, so touch just that plane instead of splitting and re-merging all three
+    l = _clahe.apply(cv2.extractChannel(lab, 0))
+    cv2.insertChannel(l, lab, 0)
+    return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=lab)
 
 
 def crop_to_roi(frame, roi):
@@ -349,7 +571,9 @@ def offset_contours(contours, roi):
     if roi is None:
         return contours
     x, y, _, _ = roi
-    return [c + np.array([x, y]) for c in contours]
+    # One int32 offset broadcast over every contour keeps OpenCV's point dtype
+    offset = np.array([x, y], dtype=np.int32)
+    return [c + offset for c in contours]
 
 
 def parse_roi_string(roi_str):
@@ -359,18 +583,24 @@ def parse_roi_string(roi_str):
     parts = roi_str.split(",")
     if len(parts) != 4:
         raise ValueError(f"ROI must be x,y,w,h — got: {roi_str}")
-    return tuple(int(p) for p in parts)
+    return (int(parts[0]), int(parts[1]), int(parts[2]), int(parts[3]))
 
 
 def throttle_fps(frame_start, target_fps):
-    """Sleep to maintain target frame rate. No-op if target_fps is 0."""
+    """Sleep until frame_start + 1/target_fps. No-op if target_fps is 0.
+
+    Returns the deadline slept to, or None if no sleep was needed. Passing the
+    deadline back in as the next frame_start keeps wake-up overshoot from
+    accumulating into FPS drift.
+    """
     if target_fps <= 0:
-        return
-    frame_budget = 1.0 / target_fps
-    elapsed = time.monotonic() - frame_start
-    remaining = frame_budget - elapsed
-    if remaining > 0:
-        time.sleep(remaining)
+        return None
+    deadline = frame_start + 1.0 / target_fps
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    time.sleep(remaining)
+    return deadline
 
 
 def get_local_ip():
@@ -387,27 +617,26 @@ def get_local_ip():
 
 _tailscale_cache = {"ip": None, "expires": 0}
 
+# Tailscale uses CGNAT range 100.64.0.0/10 (second octet 64-127)
+_TAILSCALE_IP_RE = re.compile(r'inet\s+(100\.(?:6[4-9]|[7-9]\d|1[01]\d|12[0-7])\.\d{1,3}\.\d{1,3})\b')
+
 
 def get_tailscale_ip():
     """Get the Tailscale IP address (100.64.0.0/10 CGNAT range), or None if not connected."""
     now = time.monotonic()
     if now < _tailscale_cache["expires"]:
         return _tailscale_cache["ip"]
+    ip = None
     try:
         result = subprocess.run(["ifconfig"], capture_output=True, text=True)
-        for match in re.finditer(r'inet\s+(100\.(\d+)\.\d+\.\d+)', result.stdout):
+        match = _TAILSCALE_IP_RE.search(result.stdout)
+        if match:
             ip = match.group(1)
-            second_octet = int(match.group(2))
-            # Tailscale uses CGNAT range 100.64.0.0/10 (second octet 64-127)
-            if 64 <= second_octet <= 127:
-                _tailscale_cache["ip"] = ip
-                _tailscale_cache["expires"] = now + 60
-                return ip
     except Exception:
         pass
-    _tailscale_cache["ip"] = None
+    _tailscale_cache["ip"] = ip
     _tailscale_cache["expires"] = now + 60
-    return None
+    return ip
 
 
 def select_roi(cap):
@@ -429,6 +658,9 @@ def try_open_camera(index):
     if cap.isOpened():
         return cap
     cap.release()
+    # AVFoundation fallback (Continuity Camera) only exists on macOS
+    if sys.platform != "darwin":
+        return None
     cap = cv2.VideoCapture(index, cv2.CAP_AVFOUNDATION)
     if cap.isOpened():
         return cap
@@ -438,20 +670,22 @@ def try_open_camera(index):
 
 def reconnect_camera(source, max_attempts=10, base_delay=2.0, rtsp_transport="tcp"):
     """Retry opening camera with exponential backoff. Returns cap or None."""
-    for attempt in range(max_attempts):
-        delay = min(base_delay * (2 ** attempt), 60)
-        print(f"  Reconnect attempt {attempt + 1}/{max_attempts} (waiting {delay:.0f}s)...")
+    network = _is_network_source(source)
+    if not network:
+        try:
+            index = int(source)
+        except ValueError:
+            return None
+    delays = [min(base_delay * (1 << attempt), 60) for attempt in range(max_attempts)]
+    for attempt, delay in enumerate(delays, start=1):
+        print(f"  Reconnect attempt {attempt}/{max_attempts} (waiting {delay:.0f}s)...")
         time.sleep(delay)
-        if _is_network_source(source):
+        if network:
             cap = ThreadedVideoCapture(source, rtsp_transport=rtsp_transport)
             if cap.isOpened():
                 return cap
             cap.release()
         else:
-            try:
-                index = int(source)
-            except ValueError:
-                return None
             cap = try_open_camera(index)
             if cap is not None:
                 return cap
@@ -530,10 +764,12 @@ def main():
     consecutive_failures = 0
     max_frame_failures = 30
     event_count = 0
+    paced_until = None
 
     try:
         while True:
-            frame_start = time.monotonic()
+            # Pace from the last deadline when we slept to one, otherwise from now
+            frame_start = paced_until if paced_until is not None else time.monotonic()
 
             ret, frame = cap.read()
             if not ret:
@@ -553,6 +789,7 @@ def main():
                     prev_gray = None
                     print("Reconnected to camera.")
                     send_notification("BabyPing", "Camera reconnected")
+                paced_until = None
                 time.sleep(0.1)
                 continue
             consecutive_failures = 0
@@ -638,17 +875,18 @@ def main():
 
             if frame_buffer.has_viewers() or not args.no_preview:
                 _, jpeg = cv2.imencode('.jpg', display_frame, [cv2.IMWRITE_JPEG_QUALITY, 75])
-                frame_buffer.update(jpeg.tobytes())
+                frame_buffer.update(jpeg)
             if not args.no_preview:
                 cv2.imshow("BabyPing", display_frame)
                 key = cv2.waitKey(1) & 0xFF
                 if key == ord("q"):
                     break
 
-            throttle_fps(frame_start, frame_buffer.get_fps())
+            paced_until = throttle_fps(frame_start, frame_buffer.get_fps())
     except KeyboardInterrupt:
         print("\nStopping...")
     finally:
+        event_log.close()
         if audio_monitor is not None:
             audio_monitor.stop()
         cap.release()
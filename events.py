@@ -1,67 +1,372 @@
 import collections
+import itertools
 import json
+import math
+import mmap
 import os
+import queue
+import sys
 import threading
 import time
 
+# orjson is optional; the stdlib fallback reads and writes the same JSONL
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
 
 VALID_EVENT_TYPES = ("motion", "sound")
 
+# Maps an event type to its interned copy, so cached events share one string per type
+_INTERNED_TYPES = {t: sys.intern(t) for t in VALID_EVENT_TYPES}
+
+
+class Event:
+    """A single logged event. Slotted, since the log keeps up to max_events of them.
+
+    Events stay as objects rather than columns of a packed array: filtered
+    reads already go through the per-type index, and snapshot names and
+    missing values would need side tables a packed record can't hold.
+    """
+
+    __slots__ = ("type", "timestamp", "area", "audio_level", "snapshot")
+
+    def __init__(self, type, timestamp, area=None, audio_level=None, snapshot=None):
+        self.type = type
+        self.timestamp = timestamp
+        self.area = area
+        self.audio_level = audio_level
+        self.snapshot = snapshot
+
+    @classmethod
+    def from_dict(cls, data):
+        event_type = data.get("type")
+        if isinstance(event_type, str):
+            event_type = _INTERNED_TYPES.get(event_type, event_type)
+        return cls(event_type, data.get("timestamp"), data.get("area"),
+                   data.get("audio_level"), data.get("snapshot"))
+
+    def to_dict(self):
+        return {
+            "type": self.type,
+            "timestamp": self.timestamp,
+            "area": self.area,
+            "audio_level": self.audio_level,
+            "snapshot": self.snapshot,
+        }
+
+
+# Line prefixes for the stdlib encoder, laid out exactly as json.dumps would write them
+_LINE_PREFIXES = {t: '{"type": %s, "timestamp": ' % json.dumps(t) for t in VALID_EVENT_TYPES}
+
+
+def _json_number(value):
+    """Return value as a JSON literal, or None if it needs the generic encoder."""
+    if value is None:
+        return "null"
+    # Exact type checks: bool is an int subclass, and inf/nan need json's own spelling
+    if type(value) is float:
+        return repr(value) if math.isfinite(value) else None
+    if type(value) is int:
+        return repr(value)
+    return None
+
+
+def _encode_event_json(event):
+    """Encode an Event as a JSONL line with the stdlib, filling a fixed template.
+
+    Logged events always have the same five keys, so formatting them directly
+    skips building a dict and running the generic encoder. Anything the
+    template can't express exactly falls back to json.dumps.
+    """
+    prefix = _LINE_PREFIXES.get(event.type)
+    timestamp = _json_number(event.timestamp)
+    area = _json_number(event.area)
+    audio_level = _json_number(event.audio_level)
+    snapshot = event.snapshot
+    if snapshot is None:
+        snapshot = "null"
+    elif type(snapshot) is str:
+        snapshot = json.dumps(snapshot)
+    else:
+        snapshot = None
+    if None in (prefix, timestamp, area, audio_level, snapshot):
+        return (json.dumps(event.to_dict()) + "\n").encode()
+    return (f'{prefix}{timestamp}, "area": {area}, "audio_level": {audio_level}, '
+            f'"snapshot": {snapshot}}}\n').encode()
+
+
+def _encode_event_orjson(event):
+    return orjson.dumps(event.to_dict()) + b"\n"
+
+
+# orjson's C encoder beats the template, so the template only serves the stdlib path
+_encode_event = _encode_event_orjson if orjson is not None else _encode_event_json
+
+
+def _writev_all(fd, buffers):
+    """Write every byte of buffers with os.writev, resuming after short writes.
+
+    A full disk or a signal can make writev stop partway; dropping the rest
+    would leave a truncated line that the loader skips.
+    """
+    written = os.writev(fd, buffers)
+    remaining = sum(map(len, buffers)) - written
+    if not remaining:
+        return
+    views = [memoryview(b) for b in buffers]
+    start = 0
+    while remaining:
+        # Skip the buffers already written in full, then trim the partly written one
+        while written >= len(views[start]):
+            written -= len(views[start])
+            start += 1
+        views[start] = views[start][written:]
+        written = os.writev(fd, views[start:])
+        if not written:
+            raise OSError("writev made no progress")
+        remaining -= written
+
 
 class EventLog:
-    """Thread-safe event logger backed by a JSONL file with in-memory cache."""
+    """Thread-safe event logger backed by a JSONL file with in-memory cache.
+
+    Appends are buffered and handed to a background writer thread in batches
+    of about flush_bytes, or flush_interval seconds after the oldest pending
+    line was logged; call flush() to push them out sooner. Reads are
+    served from memory, so buffering never hides events from get_events(). With persist=False the
+    log is memory-only: nothing is loaded from or written to the file.
+    """
 
-    def __init__(self, path="~/.babyping/events.jsonl", max_events=1000):
+    def __init__(self, path="~/.babyping/events.jsonl", max_events=1000, flush_bytes=64 * 1024,
+                 flush_interval=1.0, persist=True):
         self._path = os.path.expanduser(path)
+        # With persist=False the log is a memory-only cache and never touches path
+        self._persist = persist
         self._lock = threading.Lock()
         self._max_events = max_events
         self._events = collections.deque(maxlen=max_events if max_events > 0 else None)
-        os.makedirs(os.path.dirname(self._path), exist_ok=True)
-        self._load_from_disk()
+        # Per-type views of _events, kept in lockstep so filtered reads skip other types
+        self._by_type = {t: collections.deque() for t in VALID_EVENT_TYPES}
+        # Encoded lines waiting to be appended; handed to the writer once flush_bytes accumulate
+        self._pending = bytearray()
+        self._flush_bytes = flush_bytes
+        # Events are rare, so a timer bounds how long a line may sit in _pending
+        self._flush_interval = flush_interval
+        self._flush_timer = None
+        # Writer thread and its queue of byte chunks (plus threading.Event markers for flush);
+        # started on first use so the logging thread never blocks on disk I/O
+        self._write_queue = queue.SimpleQueue()
+        self._writer = None
+        # Append-mode descriptor, owned by the writer and kept for the log's lifetime
+        self._fd = None
+        if persist:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            self._load_from_disk()
 
     def _load_from_disk(self):
-        """Load existing events from the JSONL file into the in-memory deque."""
+        """Load existing events from the JSONL file into the in-memory deque.
+
+        The file is memory-mapped and walked backwards from the end, so only
+        the newest max_events lines are parsed however long the file has grown.
+        No offset index is kept beside the file: get_events never reads past
+        the cache, so the file is only ever scanned here and in prune().
+        """
         if not os.path.exists(self._path):
             return
         try:
-            with open(self._path, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        event = json.loads(line)
-                        self._events.append(event)
-                    except json.JSONDecodeError:
-                        continue
-        except OSError:
-            pass
-
-    def log_event(self, event_type, **kwargs):
+            with open(self._path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    newest_first = []
+                    end = len(mm)
+                    while end > 0 and len(newest_first) != self._events.maxlen:
+                        start = mm.rfind(b"\n", 0, end) + 1
+                        line = mm[start:end].strip()
+                        end = start - 1
+                        if not line:
+                            continue
+                        try:
+                            data = _loads(line)
+                        except ValueError:
+                            continue
+                        # The type keys the per-type index, so a corrupt unhashable one is dropped
+                        if isinstance(data, dict) and isinstance(data.get("type"), str):
+                            newest_first.append(Event.from_dict(data))
+        except (OSError, ValueError):
+            return
+        for event in reversed(newest_first):
+            self._append_locked(event)
+
+    def log_event(self, event_type, *, timestamp=None, area=None, audio_level=None, snapshot=None):
         """Append an event to both in-memory cache and log file.
 
         Args:
             event_type: "motion" or "sound"
-            **kwargs: Optional keys — timestamp, area, audio_level, snapshot
+            timestamp: Event time in seconds since the epoch; defaults to now.
+            area: Motion area, for motion events.
+            audio_level: Audio level, for sound events.
+            snapshot: Filename of the snapshot saved with the event.
         """
-        if event_type not in VALID_EVENT_TYPES:
+        interned = _INTERNED_TYPES.get(event_type)
+        if interned is None:
             raise ValueError(f"Invalid event type: {event_type} (must be one of {VALID_EVENT_TYPES})")
 
-        event = {
-            "type": event_type,
-            "timestamp": kwargs.get("timestamp", time.time()),
-            "area": kwargs.get("area"),
-            "audio_level": kwargs.get("audio_level"),
-            "snapshot": kwargs.get("snapshot"),
-        }
+        event = Event(
+            interned,
+            time.time() if timestamp is None else timestamp,
+            area,
+            audio_level,
+            snapshot,
+        )
+        if not self._persist:
+            with self._lock:
+                self._append_locked(event)
+            return
 
+        # Encode before taking the lock so concurrent writers only serialize on the appends
+        line = _encode_event(event)
+
+        with self._lock:
+            self._append_locked(event)
+            self._pending += line
+            if len(self._pending) >= self._flush_bytes:
+                self._flush_locked()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self._flush_interval, self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _timed_flush(self):
         with self._lock:
-            self._events.append(event)
+            self._flush_timer = None
+            self._flush_locked()
+
+    def _append_locked(self, event):
+        """Add an event to the cache and its type index. Caller must hold the lock."""
+        if len(self._events) == self._events.maxlen:
+            # The deque is about to drop its oldest event, which is also the oldest of its type
+            evicted = self._by_type.get(self._events[0].type)
+            if evicted:
+                evicted.popleft()
+        self._events.append(event)
+        typed = self._by_type.get(event.type)
+        if typed is not None:
+            typed.append(event)
+
+    def _flush_locked(self, wait=False):
+        """Hand pending lines to the writer, optionally waiting until they are written.
+
+        Caller must hold the lock. The writer never takes it, so waiting here is
+        safe and guarantees no other chunk is queued meanwhile.
+        """
+        if self._pending:
+            chunk = self._pending
+            self._pending = bytearray()
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="EventLogWriter", daemon=True)
+                self._writer.start()
+            self._write_queue.put(chunk)
+        if wait and self._writer is not None:
+            done = threading.Event()
+            self._write_queue.put(done)
+            # A writer that died can never set the marker, so don't wait on it forever
+            while not done.wait(0.5):
+                if not self._writer.is_alive():
+                    break
+
+    def _write_loop(self):
+        """Writer thread: drain queued chunks and append each batch with writev."""
+        while True:
+            item = self._write_queue.get()
+            batch = []
+            markers = []
+            while True:
+                if item is None:
+                    self._finish_batch(batch, markers)
+                    return
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= 256:
+                    break
+                try:
+                    item = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._finish_batch(batch, markers)
+
+    def _finish_batch(self, batch, markers):
+        try:
+            self._write_batch(batch)
+        finally:
+            # Release flush() callers even if the write failed unexpectedly
+            for marker in markers:
+                marker.set()
+
+    def _write_batch(self, batch):
+        if not batch:
+            return
+        try:
+            if self._fd is None:
+                # Not preallocated: posix_fallocate grows the file size, so O_APPEND
+                # writes would land after a run of NUL bytes the loader can't parse
+                self._fd = os.open(self._path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            _writev_all(self._fd, batch)
+        except Exception:
+            # Dropped, and the writer carries on — the deque still has the events
+            # and sync_to_disk rewrites them
+            self._close_fd()
+
+    def _close_fd(self):
+        """Close the append descriptor. Only call while the writer is idle."""
+        if self._fd is not None:
             try:
-                with open(self._path, "a") as f:
-                    f.write(json.dumps(event) + "\n")
+                os.close(self._fd)
             except OSError:
                 pass
+            self._fd = None
+
+    def flush(self):
+        """Write any buffered events to the log file and wait for the write."""
+        with self._lock:
+            self._flush_locked(wait=True)
+
+    def commit(self):
+        """Flush buffered events and fsync the log file.
+
+        Nothing else fsyncs appends, so a write reaches the page cache but may
+        not survive a power loss until the next commit().
+        """
+        if not self._persist:
+            return
+        with self._lock:
+            self._flush_locked(wait=True)
+            # The writer is idle now and only closes the descriptor on a failed write
+            if self._fd is not None:
+                try:
+                    os.fsync(self._fd)
+                except OSError:
+                    pass
+
+    def close(self):
+        """Flush buffered events, stop the writer thread and release the descriptor."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._flush_locked(wait=True)
+            if self._writer is not None:
+                self._write_queue.put(None)
+                self._writer.join()
+                self._writer = None
+            self._close_fd()
 
     def get_events(self, limit=50, offset=0, event_type=None):
         """Read events from in-memory cache, newest first.
@@ -74,40 +379,81 @@ class EventLog:
         Returns:
             List of event dicts, newest first.
         """
+        # islice rejects negatives, and both values can come straight from a query string
+        offset = max(offset, 0)
+        limit = max(limit, 0)
         with self._lock:
-            if event_type:
-                events = [e for e in self._events if e.get("type") == event_type]
-            else:
-                events = list(self._events)
-
-        events.reverse()
-        return events[offset:offset + limit]
+            source = self._by_type.get(event_type, ()) if event_type else self._events
+            # Walk newest-first and stop at the requested page instead of copying the whole cache
+            page = itertools.islice(reversed(source), offset, offset + limit)
+            return [e.to_dict() for e in page]
 
     def prune(self, max_events=1000):
         """Keep only the newest max_events entries in the file.
 
         The in-memory deque auto-prunes via maxlen. This method only
-        trims the on-disk file for periodic maintenance.
+        trims the on-disk file for periodic maintenance; max_events=0 keeps
+        everything. The file's last max_events lines are written to a
+        temporary file, fsynced, and renamed over the log, so a crash
+        mid-prune leaves either the old file or the new one.
         """
+        if not self._persist or max_events <= 0:
+            return
         with self._lock:
-            if not os.path.exists(self._path):
+            self._flush_locked(wait=True)
+            tail = self._read_tail_lines(max_events)
+            if tail is None:
                 return
-            with open(self._path, "r") as f:
-                lines = f.readlines()
-
-            if len(lines) <= max_events:
+            tmp_path = f"{self._path}.tmp"
+            try:
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                # Left behind by an interrupted prune
+                os.remove(tmp_path)
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            try:
+                with open(fd, "wb") as f:
+                    f.write(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
                 return
+            # The cached descriptor still points at the replaced file
+            self._close_fd()
 
-            keep = lines[-max_events:]
-            with open(self._path, "w") as f:
-                f.writelines(keep)
+    def _read_tail_lines(self, count):
+        """Return the file's last count lines as bytes, or None if it has no more than that."""
+        try:
+            with open(self._path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # A trailing newline ends the last line rather than starting a new one
+                    pos = len(mm) - 1 if mm[-1:] == b"\n" else len(mm)
+                    for _ in range(count):
+                        pos = mm.rfind(b"\n", 0, pos)
+                        if pos == -1:
+                            return None
+                    return mm[pos + 1:]
+        except (OSError, ValueError):
+            return None
 
     def sync_to_disk(self):
         """Rewrite the JSONL file from the in-memory deque."""
+        if not self._persist:
+            return
         with self._lock:
+            # The rewrite covers everything still buffered; wait out chunks already queued
+            self._pending.clear()
+            self._flush_locked(wait=True)
             try:
-                with open(self._path, "w") as f:
-                    for event in self._events:
-                        f.write(json.dumps(event) + "\n")
+                # A 1 MiB buffer turns a full cache rewrite into a handful of write syscalls
+                with open(self._path, "wb", buffering=1 << 20) as f:
+                    f.writelines(map(_encode_event, self._events))
             except OSError:
                 pass
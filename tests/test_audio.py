@@ -1,11 +1,8 @@
-import sys
-import os
 import time
 
 import numpy as np
 import pytest
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from unittest.mock import MagicMock, patch, call
 
 from audio import AudioMonitor
@@ -1,7 +1,11 @@
+import argparse
 import glob
+import itertools
+import multiprocessing
 import sys
 import os
 import threading
+import uuid
 
 import cv2
 import numpy as np
@@ -9,10 +13,9 @@ import pytest
 
 import time
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from unittest.mock import MagicMock, patch
 
-from babyping import apply_night_mode, crop_to_roi, detect_motion, FrameBuffer, get_tailscale_ip, _is_network_source, _tailscale_cache, mask_credentials, offset_contours, open_camera_source, parse_args, parse_roi_string, reconnect_camera, save_snapshot, ThreadedVideoCapture, throttle_fps, try_open_camera, SENSITIVITY_THRESHOLDS
+from babyping import apply_night_mode, crop_to_roi, detect_motion, FrameBuffer, get_tailscale_ip, _is_network_source, _tailscale_cache, list_snapshots, mask_credentials, offset_contours, open_camera_source, parse_args, parse_roi_string, reconnect_camera, save_snapshot, SharedFrameReader, SnapshotRotator, ThreadedVideoCapture, throttle_fps, try_open_camera, SENSITIVITY_THRESHOLDS
 
 
 # --- detect_motion tests ---
@@ -22,6 +25,18 @@ def make_gray_frame(width=320, height=240, value=0):
     return np.full((height, width), value, dtype=np.uint8)
 
 
+# Pre-encoded filler for snapshot-rotation tests, whose file contents don't matter
+_JPEG_BLOB = cv2.imencode(".jpg", make_gray_frame(value=128))[1].tobytes()
+
+
+@pytest.fixture(scope="session")
+def zero_frame():
+    """Read-only black frame shared across tests — copy() it before drawing on it."""
+    frame = make_gray_frame(value=0)
+    frame.setflags(write=False)
+    return frame
+
+
 class TestDetectMotion:
     def test_identical_frames_no_motion(self):
         frame = make_gray_frame(value=128)
@@ -29,9 +44,9 @@ class TestDetectMotion:
         assert detected is False
         assert area == 0
 
-    def test_different_frames_motion_detected(self):
-        prev = make_gray_frame(value=0)
-        curr = make_gray_frame(value=0)
+    def test_different_frames_motion_detected(self, zero_frame):
+        prev = zero_frame
+        curr = zero_frame.copy()
         # Draw a white rectangle on the current frame to simulate movement
         curr[50:150, 50:200] = 255
         detected, contours, area = detect_motion(prev, curr, threshold=500)
@@ -39,117 +54,161 @@ class TestDetectMotion:
         assert area > 0
         assert len(contours) > 0
 
-    def test_motion_below_threshold_not_detected(self):
-        prev = make_gray_frame(value=0)
-        curr = make_gray_frame(value=0)
+    def test_motion_below_threshold_not_detected(self, zero_frame):
+        prev = zero_frame
+        curr = zero_frame.copy()
         # Small change — a tiny 5x5 square
         curr[10:15, 10:15] = 255
         detected, _, area = detect_motion(prev, curr, threshold=5000)
         assert detected is False
         assert area < 5000
 
-    def test_motion_above_threshold_detected(self):
-        prev = make_gray_frame(value=0)
-        curr = make_gray_frame(value=0)
+    def test_motion_above_threshold_detected(self, zero_frame):
+        prev = zero_frame
+        curr = zero_frame.copy()
         # Large change — a 200x200 square
         curr[0:200, 0:200] = 255
         detected, _, area = detect_motion(prev, curr, threshold=500)
         assert detected is True
         assert area >= 500
 
+    def test_subthreshold_noise_skips_contour_search(self, zero_frame):
+        curr = zero_frame.copy()
+        curr[:] = 20  # below the 25-level pixel threshold everywhere
+        with patch("babyping.cv2.findContours") as mock_find:
+            detected, contours, area = detect_motion(zero_frame, curr, threshold=500)
+        mock_find.assert_not_called()
+        assert detected is False
+        assert len(contours) == 0
+        assert area == 0
+
+    def test_identical_frames_skip_absdiff(self):
+        frame = make_gray_frame(value=128)
+        with patch("babyping.cv2.absdiff") as mock_absdiff:
+            detected, _, area = detect_motion(frame, frame.copy(), threshold=500)
+        mock_absdiff.assert_not_called()
+        assert detected is False
+        assert area == 0
+
+    def test_change_just_above_pixel_threshold_still_detected(self, zero_frame):
+        curr = zero_frame.copy()
+        curr[0:100, 0:100] = 26
+        detected, _, area = detect_motion(zero_frame, curr, threshold=500)
+        assert detected is True
+        assert area >= 500
+
+    def test_area_matches_reference_pipeline(self, zero_frame):
+        curr = zero_frame.copy()
+        curr[40:90, 60:160] = 200
+        curr[150:170, 200:230] = 90
+        _, thresh = cv2.threshold(cv2.absdiff(zero_frame, curr), 25, 255, cv2.THRESH_BINARY)
+        thresh = cv2.dilate(thresh, None, iterations=2)
+        ref_contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        expected = sum(cv2.contourArea(c) for c in ref_contours)
+        _, contours, area = detect_motion(zero_frame, curr, threshold=500)
+        assert len(contours) == len(ref_contours)
+        assert area == expected
+
+    def test_wide_frames_report_full_resolution_area(self):
+        prev = make_gray_frame(width=1280, height=720)
+        curr = prev.copy()
+        curr[200:400, 400:800] = 255
+        detected, contours, area = detect_motion(prev, curr, threshold=500)
+        assert detected is True
+        # Dilation adds a small margin around the 200x400 block
+        assert 200 * 400 <= area < 230 * 430
+        x, y, w, h = cv2.boundingRect(contours[0])
+        assert abs(x - 400) <= 16 and abs(y - 200) <= 16
+        assert abs(w - 400) <= 32 and abs(h - 200) <= 32
+
+    def test_wide_frames_are_downsampled(self):
+        prev = make_gray_frame(width=1280, height=720)
+        curr = prev.copy()
+        curr[200:400, 400:800] = 255
+        with patch("babyping.cv2.absdiff", wraps=cv2.absdiff) as mock_absdiff:
+            detect_motion(prev, curr, threshold=500)
+        assert mock_absdiff.call_args[0][0].shape == (180, 320)
+
+    def test_zero_frame_is_read_only(self, zero_frame):
+        with pytest.raises(ValueError):
+            zero_frame[0, 0] = 255
+
 
 # --- parse_args tests ---
 
 class TestParseArgs:
-    def test_defaults(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_defaults(self):
+        args = parse_args([])
         assert args.camera == "0"
         assert args.sensitivity == "medium"
         assert args.cooldown == 30
         assert args.no_preview is False
 
-    def test_custom_values(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", [
-            "babyping", "--camera", "2", "--sensitivity", "high",
-            "--cooldown", "10", "--no-preview",
+    def test_custom_values(self):
+        args = parse_args([
+            "--camera", "2", "--sensitivity", "high", "--cooldown", "10", "--no-preview",
         ])
-        args = parse_args()
         assert args.camera == "2"
         assert args.sensitivity == "high"
         assert args.cooldown == 10
         assert args.no_preview is True
 
-    def test_snapshot_defaults(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_snapshot_defaults(self):
+        args = parse_args([])
         assert args.snapshot_dir == "~/.babyping/events"
         assert args.max_snapshots == 100
         assert args.snapshots is False
 
-    def test_snapshot_custom_values(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", [
-            "babyping", "--snapshot-dir", "/tmp/snaps",
-            "--max-snapshots", "50", "--snapshots",
+    def test_snapshot_custom_values(self):
+        args = parse_args([
+            "--snapshot-dir", "/tmp/snaps", "--max-snapshots", "50", "--snapshots",
         ])
-        args = parse_args()
         assert args.snapshot_dir == "/tmp/snaps"
         assert args.max_snapshots == 50
         assert args.snapshots is True
 
-    def test_night_mode_default_off(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_night_mode_default_off(self):
+        args = parse_args([])
         assert args.night_mode is False
 
-    def test_night_mode_enabled(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--night-mode"])
-        args = parse_args()
+    def test_night_mode_enabled(self):
+        args = parse_args(["--night-mode"])
         assert args.night_mode is True
 
-    def test_invalid_sensitivity_rejected(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--sensitivity", "ultra"])
+    def test_invalid_sensitivity_rejected(self):
         with pytest.raises(SystemExit):
-            parse_args()
+            parse_args(["--sensitivity", "ultra"])
 
-    def test_host_default_localhost(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_host_default_localhost(self):
+        args = parse_args([])
         assert args.host == "127.0.0.1"
 
-    def test_host_custom_value(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--host", "0.0.0.0"])
-        args = parse_args()
+    def test_host_custom_value(self):
+        args = parse_args(["--host", "0.0.0.0"])
         assert args.host == "0.0.0.0"
 
-    def test_password_default_none(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_password_default_none(self):
+        args = parse_args([])
         assert args.password is None
 
-    def test_password_custom_value(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--password", "secret"])
-        args = parse_args()
+    def test_password_custom_value(self):
+        args = parse_args(["--password", "secret"])
         assert args.password == "secret"
 
-    def test_roi_default_none(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_roi_default_none(self):
+        args = parse_args([])
         assert args.roi is None
 
-    def test_roi_custom_value(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--roi", "100,80,400,300"])
-        args = parse_args()
+    def test_roi_custom_value(self):
+        args = parse_args(["--roi", "100,80,400,300"])
         assert args.roi == "100,80,400,300"
 
-    def test_port_default(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_port_default(self):
+        args = parse_args([])
         assert args.port == 8080
 
-    def test_port_custom(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--port", "9000"])
-        args = parse_args()
+    def test_port_custom(self):
+        args = parse_args(["--port", "9000"])
         assert args.port == 9000
 
 
@@ -196,22 +255,95 @@ class TestSaveSnapshot:
     def test_max_snapshots_enforced(self, tmp_path):
         frame = make_gray_frame(value=128)
         for i in range(5):
-            filepath = str(tmp_path / f"2026-01-0{i+1}T00-00-00.jpg")
-            cv2.imwrite(filepath, frame)
+            (tmp_path / f"2026-01-0{i+1}T00-00-00.jpg").write_bytes(_JPEG_BLOB)
         save_snapshot(frame, snapshot_dir=str(tmp_path), max_snapshots=3)
         files = sorted(glob.glob(str(tmp_path / "*.jpg")))
         assert len(files) == 3
 
+    def test_max_snapshots_removes_oldest(self, tmp_path):
+        frame = make_gray_frame(value=128)
+        for i in range(5):
+            (tmp_path / f"2026-01-0{i+1}T00-00-00.jpg").write_bytes(_JPEG_BLOB)
+        path = save_snapshot(frame, snapshot_dir=str(tmp_path), max_snapshots=3)
+        names = sorted(os.path.basename(f) for f in glob.glob(str(tmp_path / "*.jpg")))
+        assert names == ["2026-01-04T00-00-00.jpg", "2026-01-05T00-00-00.jpg", os.path.basename(path)]
+
+    def test_saved_file_is_decodable_jpeg(self, tmp_path):
+        frame = make_gray_frame(value=128)
+        path = save_snapshot(frame, snapshot_dir=str(tmp_path))
+        decoded = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        assert decoded.shape == frame.shape
+
     def test_max_snapshots_zero_means_unlimited(self, tmp_path):
         frame = make_gray_frame(value=128)
         for i in range(5):
-            filepath = str(tmp_path / f"2026-01-0{i+1}T00-00-00.jpg")
-            cv2.imwrite(filepath, frame)
+            (tmp_path / f"2026-01-0{i+1}T00-00-00.jpg").write_bytes(_JPEG_BLOB)
         save_snapshot(frame, snapshot_dir=str(tmp_path), max_snapshots=0)
         files = glob.glob(str(tmp_path / "*.jpg"))
         assert len(files) == 6  # 5 existing + 1 new
 
 
+class TestSnapshotRotator:
+    def test_seeds_from_existing_files(self, tmp_path):
+        for i in range(3):
+            (tmp_path / f"2026-01-0{i+1}T00-00-00.jpg").write_bytes(_JPEG_BLOB)
+        rotator = SnapshotRotator(str(tmp_path), max_snapshots=3)
+        new = tmp_path / "2026-01-04T00-00-00.jpg"
+        new.write_bytes(_JPEG_BLOB)
+        rotator.add(str(new))
+        names = sorted(os.path.basename(f) for f in glob.glob(str(tmp_path / "*.jpg")))
+        assert names == ["2026-01-02T00-00-00.jpg", "2026-01-03T00-00-00.jpg", "2026-01-04T00-00-00.jpg"]
+
+    def test_seed_skips_dotfiles(self, tmp_path):
+        hidden = tmp_path / ".2026-01-01T00-00-00.jpg"
+        hidden.write_bytes(_JPEG_BLOB)
+        rotator = SnapshotRotator(str(tmp_path), max_snapshots=1)
+        new = tmp_path / "2026-01-02T00-00-00.jpg"
+        new.write_bytes(_JPEG_BLOB)
+        rotator.add(str(new))
+        assert hidden.exists()
+        assert new.exists()
+
+    def test_does_not_rescan_directory(self, tmp_path):
+        rotator = SnapshotRotator(str(tmp_path), max_snapshots=2)
+        with patch("babyping.os.scandir") as mock_scandir:
+            for i in range(4):
+                path = tmp_path / f"2026-01-0{i+1}T00-00-00.jpg"
+                path.write_bytes(_JPEG_BLOB)
+                rotator.add(str(path))
+        mock_scandir.assert_not_called()
+        assert len(glob.glob(str(tmp_path / "*.jpg"))) == 2
+
+    def test_same_path_added_twice_counts_once(self, tmp_path):
+        rotator = SnapshotRotator(str(tmp_path), max_snapshots=2)
+        first = tmp_path / "2026-01-01T00-00-00.jpg"
+        second = tmp_path / "2026-01-02T00-00-00.jpg"
+        for path in (first, second, second):
+            path.write_bytes(_JPEG_BLOB)
+            rotator.add(str(path))
+        assert first.exists()
+        assert second.exists()
+
+
+class TestListSnapshots:
+    def test_scans_directory_newest_first(self, tmp_path):
+        for i in range(5):
+            (tmp_path / f"2026-01-0{i+1}T00-00-00.jpg").write_bytes(_JPEG_BLOB)
+        (tmp_path / "notes.txt").write_text("x")
+        assert list_snapshots(str(tmp_path), limit=2) == ["2026-01-05T00-00-00.jpg", "2026-01-04T00-00-00.jpg"]
+
+    def test_missing_directory_is_empty(self, tmp_path):
+        assert list_snapshots(str(tmp_path / "missing")) == []
+
+    def test_uses_rotator_after_save(self, tmp_path):
+        (tmp_path / "2026-01-01T00-00-00.jpg").write_bytes(_JPEG_BLOB)
+        path = save_snapshot(make_gray_frame(value=128), snapshot_dir=str(tmp_path), max_snapshots=5)
+        with patch("babyping.os.scandir") as mock_scandir:
+            names = list_snapshots(str(tmp_path))
+        mock_scandir.assert_not_called()
+        assert names == [os.path.basename(path), "2026-01-01T00-00-00.jpg"]
+
+
 # --- apply_night_mode tests ---
 
 class TestApplyNightMode:
@@ -233,6 +365,15 @@ class TestApplyNightMode:
         apply_night_mode(frame)
         np.testing.assert_array_equal(frame, original)
 
+    def test_matches_clahe_on_lightness_channel(self):
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 80, size=(240, 320, 3), dtype=np.uint8)
+        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.split(lab)
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        expected = cv2.cvtColor(cv2.merge([clahe.apply(l), a, b]), cv2.COLOR_LAB2BGR)
+        np.testing.assert_array_equal(apply_night_mode(frame), expected)
+
 
 # --- ROI tests ---
 
@@ -258,15 +399,23 @@ class TestROI:
         assert result[0][0][0][0] == 50  # x offset
         assert result[0][0][0][1] == 30  # y offset
 
+    def test_offset_contours_keeps_int32_and_offsets_all(self):
+        a = np.array([[[0, 0]], [[4, 0]], [[4, 4]]], dtype=np.int32)
+        b = np.array([[[20, 20]], [[25, 25]]], dtype=np.int32)
+        result = offset_contours([a, b], (7, 3, 50, 50))
+        assert all(c.dtype == np.int32 for c in result)
+        np.testing.assert_array_equal(result[0], a + [7, 3])
+        np.testing.assert_array_equal(result[1], b + [7, 3])
+
     def test_offset_contours_none_roi_unchanged(self):
         contour = np.array([[[5, 5]], [[15, 5]], [[15, 15]], [[5, 15]]], dtype=np.int32)
         result = offset_contours([contour], None)
         np.testing.assert_array_equal(result[0], contour)
 
-    def test_blur_after_crop_matches_full_frame_when_no_roi(self):
+    def test_blur_after_crop_matches_full_frame_when_no_roi(self, zero_frame):
         """With no ROI, blur-after-crop should produce same result as blur-before-crop."""
-        prev = make_gray_frame(value=0)
-        curr = make_gray_frame(value=0)
+        prev = zero_frame
+        curr = zero_frame.copy()
         curr[50:150, 50:200] = 255
 
         # Old approach: blur full frame, then crop (no-op with roi=None)
@@ -282,10 +431,10 @@ class TestROI:
         assert motion_old == motion_new
         assert area_old == area_new
 
-    def test_blur_after_crop_detects_motion_in_roi(self):
+    def test_blur_after_crop_detects_motion_in_roi(self, zero_frame):
         """Blur-after-crop should correctly detect motion within a specified ROI."""
-        prev = make_gray_frame(value=0)
-        curr = make_gray_frame(value=0)
+        prev = zero_frame
+        curr = zero_frame.copy()
         # Put motion inside the ROI region
         curr[50:150, 100:250] = 255
 
@@ -310,6 +459,13 @@ class TestParseRoiString:
         with pytest.raises(ValueError):
             parse_roi_string("100,80")
 
+    def test_non_integer_raises(self):
+        with pytest.raises(ValueError):
+            parse_roi_string("100,80,abc,300")
+
+    def test_whitespace_around_values_allowed(self):
+        assert parse_roi_string("100, 80, 400, 300") == (100, 80, 400, 300)
+
 
 # --- FrameBuffer tests ---
 
@@ -433,6 +589,54 @@ class TestFrameBuffer:
         buf.set_fps(5)
         assert buf.get_fps() == 5
 
+    def test_encoded_array_returned_as_memoryview(self):
+        buf = FrameBuffer()
+        _, jpeg = cv2.imencode(".jpg", make_gray_frame(value=128))
+        buf.update(jpeg)
+        result = buf.get()
+        assert isinstance(result, memoryview)
+        assert result[:2] == b"\xff\xd8"
+        assert bytes(result) == jpeg.tobytes()
+        assert b"--frame\r\n" + result == b"--frame\r\n" + jpeg.tobytes()
+
+    def test_wait_frame_returns_new_frame(self):
+        buf = FrameBuffer()
+        buf.update(b"first")
+        generation, frame = buf.wait_frame(0, timeout=0.1)
+        assert generation == 1
+        assert frame == b"first"
+
+    def test_wait_frame_times_out_without_new_frame(self):
+        buf = FrameBuffer()
+        buf.update(b"first")
+        start = time.monotonic()
+        generation, frame = buf.wait_frame(1, timeout=0.05)
+        assert generation == 1
+        assert frame == b"first"
+        assert time.monotonic() - start >= 0.04
+
+    def test_wait_frame_wakes_on_update(self):
+        buf = FrameBuffer()
+        timer = threading.Timer(0.05, buf.update, args=(b"later",))
+        timer.start()
+        start = time.monotonic()
+        generation, frame = buf.wait_frame(0, timeout=2.0)
+        timer.join()
+        assert frame == b"later"
+        assert generation == 1
+        assert time.monotonic() - start < 1.0
+
+    def test_wait_frame_counts_as_viewer(self):
+        buf = FrameBuffer()
+        buf.wait_frame(0, timeout=0.01)
+        assert buf.has_viewers() is True
+
+    def test_uses_slots(self):
+        buf = FrameBuffer()
+        assert not hasattr(buf, "__dict__")
+        with pytest.raises(AttributeError):
+            buf.unknown_field = 1
+
     def test_has_viewers_true_after_get(self):
         buf = FrameBuffer()
         buf.update(b"frame")
@@ -456,48 +660,40 @@ class TestFrameBuffer:
 # --- parse_args audio flag tests ---
 
 class TestParseArgsAudio:
-    def test_no_audio_default_off(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_no_audio_default_off(self):
+        args = parse_args([])
         assert args.no_audio is False
 
-    def test_no_audio_flag(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--no-audio"])
-        args = parse_args()
+    def test_no_audio_flag(self):
+        args = parse_args(["--no-audio"])
         assert args.no_audio is True
 
-    def test_audio_device_default_none(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_audio_device_default_none(self):
+        args = parse_args([])
         assert args.audio_device is None
 
-    def test_audio_device_custom(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--audio-device", "2"])
-        args = parse_args()
+    def test_audio_device_custom(self):
+        args = parse_args(["--audio-device", "2"])
         assert args.audio_device == 2
 
-    def test_audio_threshold_default_none(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_audio_threshold_default_none(self):
+        args = parse_args([])
         assert args.audio_threshold is None
 
-    def test_audio_threshold_custom(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--audio-threshold", "0.05"])
-        args = parse_args()
+    def test_audio_threshold_custom(self):
+        args = parse_args(["--audio-threshold", "0.05"])
         assert args.audio_threshold == 0.05
 
 
 # --- parse_args --fps tests ---
 
 class TestParseArgsFps:
-    def test_fps_default_is_10(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_fps_default_is_10(self):
+        args = parse_args([])
         assert args.fps == 10
 
-    def test_fps_custom_value(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--fps", "5"])
-        args = parse_args()
+    def test_fps_custom_value(self):
+        args = parse_args(["--fps", "5"])
         assert args.fps == 5
 
 
@@ -525,6 +721,26 @@ class TestThrottleFps:
         # Should return almost immediately (< 10ms)
         assert (after - before) < 0.01
 
+    def test_returns_deadline_after_sleeping(self):
+        frame_start = time.monotonic()
+        with patch("babyping.time.sleep"):
+            deadline = throttle_fps(frame_start, 20)
+        assert deadline == frame_start + 1.0 / 20
+
+    def test_returns_none_when_over_budget(self):
+        with patch("babyping.time.sleep") as mock_sleep:
+            assert throttle_fps(time.monotonic() - 1.0, 10) is None
+        mock_sleep.assert_not_called()
+
+    def test_chained_deadlines_do_not_drift(self):
+        """Feeding the returned deadline back in keeps frames on a fixed grid."""
+        start = time.monotonic()
+        frame_start = start
+        with patch("babyping.time.sleep"):
+            for _ in range(5):
+                frame_start = throttle_fps(frame_start, 50)
+        assert frame_start == pytest.approx(start + 5 / 50)
+
     def test_fps_zero_means_no_throttle(self):
         """fps=0 should disable throttling entirely."""
         frame_start = time.monotonic()
@@ -551,7 +767,8 @@ class TestTryOpenCamera:
             result = try_open_camera(0)
         assert result is None
 
-    def test_tries_avfoundation_fallback(self):
+    def test_tries_avfoundation_fallback(self, monkeypatch):
+        monkeypatch.setattr("babyping.sys.platform", "darwin")
         mock_cap_fail = MagicMock()
         mock_cap_fail.isOpened.return_value = False
         mock_cap_ok = MagicMock()
@@ -562,6 +779,15 @@ class TestTryOpenCamera:
         assert result is mock_cap_ok
         assert mock_vc.call_count == 2
 
+    def test_skips_avfoundation_fallback_off_macos(self, monkeypatch):
+        monkeypatch.setattr("babyping.sys.platform", "linux")
+        mock_cap_fail = MagicMock()
+        mock_cap_fail.isOpened.return_value = False
+        with patch("babyping.cv2.VideoCapture", return_value=mock_cap_fail) as mock_vc:
+            result = try_open_camera(0)
+        assert result is None
+        assert mock_vc.call_count == 1
+
 
 # --- reconnect_camera tests ---
 
@@ -601,6 +827,13 @@ class TestReconnectCamera:
         delays = [call.args[0] for call in mock_sleep.call_args_list]
         # 10, 20, 40, 60, 60, 60, 60, 60
         assert all(d <= 60 for d in delays)
+        assert delays == [10.0, 20.0, 40.0, 60, 60, 60, 60, 60]
+
+    def test_invalid_source_returns_none_without_waiting(self):
+        with patch("babyping.time.sleep") as mock_sleep:
+            result = reconnect_camera("not-a-camera", max_attempts=3, base_delay=1.0)
+        assert result is None
+        mock_sleep.assert_not_called()
 
 
 # --- get_tailscale_ip tests ---
@@ -666,6 +899,31 @@ class TestGetTailscaleIp:
             result = get_tailscale_ip()
         assert result == "100.127.255.254"
 
+    def test_ignores_addresses_just_outside_cgnat_range(self):
+        """100.63.x.x and 100.128.x.x are outside 100.64.0.0/10."""
+        fake_output = (
+            "en1: flags=8863<UP> mtu 1500\n"
+            "\tinet 100.63.255.254 netmask 0xffffff00\n"
+            "en2: flags=8863<UP> mtu 1500\n"
+            "\tinet 100.128.0.1 netmask 0xffffff00\n"
+        )
+        with patch("babyping.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout=fake_output, returncode=0)
+            result = get_tailscale_ip()
+        assert result is None
+
+    def test_skips_non_cgnat_before_tailscale_ip(self):
+        fake_output = (
+            "en1: flags=8863<UP> mtu 1500\n"
+            "\tinet 100.0.0.1 netmask 0xffffff00\n"
+            "utun3: flags=8051<UP> mtu 1280\n"
+            "\tinet 100.101.5.6 --> 100.101.5.6 netmask 0xffffffff\n"
+        )
+        with patch("babyping.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout=fake_output, returncode=0)
+            result = get_tailscale_ip()
+        assert result == "100.101.5.6"
+
     def test_returns_first_tailscale_ip_if_multiple(self):
         """If multiple Tailscale IPs found, return the first one."""
         fake_output = (
@@ -722,22 +980,33 @@ class TestTailscaleIpCache:
         assert mock_run.call_count == 1
 
 
+@pytest.fixture(scope="module")
+def flask_app():
+    """One Flask app shared by the start_web_server tests, which never run it."""
+    from flask import Flask
+    return Flask(__name__)
+
+
 class TestStartWebServer:
-    def test_returns_thread(self):
+    def test_returns_thread(self, flask_app):
         from babyping import start_web_server
-        from flask import Flask
-        app = Flask(__name__)
-        thread = start_web_server(app, "127.0.0.1", 9999)
+        thread = start_web_server(flask_app, "127.0.0.1", 9999)
         assert isinstance(thread, threading.Thread)
         assert thread.daemon is True
 
-    def test_thread_is_not_started(self):
+    def test_thread_is_not_started(self, flask_app):
         from babyping import start_web_server
-        from flask import Flask
-        app = Flask(__name__)
-        thread = start_web_server(app, "127.0.0.1", 9999)
+        thread = start_web_server(flask_app, "127.0.0.1", 9999)
         assert not thread.is_alive()
 
+    def test_waitress_keeps_threads_for_polls(self, flask_app):
+        """Open streams each hold a worker, so waitress gets more than a few threads."""
+        from babyping import start_web_server, WEB_SERVER_THREADS
+        with patch("waitress.serve") as serve:
+            start_web_server(flask_app, "127.0.0.1", 9999).run()
+        assert serve.call_args.kwargs["threads"] == WEB_SERVER_THREADS
+        assert WEB_SERVER_THREADS > 4
+
 
 class TestSaveSnapshotDiskError:
     def test_returns_none_on_os_error(self, tmp_path):
@@ -883,6 +1152,129 @@ class TestThreadedVideoCapture:
             tvc.release()
 
 
+def _read_shared_frame_mean(shm_name, result_queue):
+    """Child-process helper: attach to the shared frame block and report the frame mean."""
+    reader = SharedFrameReader(shm_name)
+    ret, frame = reader.read()
+    result_queue.put((ret, float(frame.mean()) if ret else None, frame.shape if ret else None))
+    del frame
+    reader.close()
+
+
+class TestThreadedVideoCaptureSharedMemory:
+    def test_read_still_works_with_shm(self):
+        frame = np.full((240, 320, 3), 77, dtype=np.uint8)
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, frame)
+        with patch("babyping.cv2.VideoCapture", return_value=mock_cap):
+            tvc = ThreadedVideoCapture("rtsp://fake", shm_name=f"babyping-test-{uuid.uuid4().hex[:8]}")
+            time.sleep(0.1)
+            ret, result = tvc.read()
+            assert ret is True
+            np.testing.assert_array_equal(result, frame)
+            tvc.release()
+
+    def test_reader_sees_frame_in_same_process(self):
+        frame = np.full((240, 320, 3), 200, dtype=np.uint8)
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, frame)
+        shm_name = f"babyping-test-{uuid.uuid4().hex[:8]}"
+        with patch("babyping.cv2.VideoCapture", return_value=mock_cap):
+            tvc = ThreadedVideoCapture("rtsp://fake", shm_name=shm_name)
+            time.sleep(0.1)
+            reader = SharedFrameReader(shm_name)
+            ret, shared = reader.read()
+            assert ret is True
+            np.testing.assert_array_equal(shared, frame)
+            del shared
+            reader.close()
+            tvc.release()
+
+    def test_child_process_sees_frame(self):
+        frame = np.full((240, 320, 3), 42, dtype=np.uint8)
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, frame)
+        shm_name = f"babyping-test-{uuid.uuid4().hex[:8]}"
+        with patch("babyping.cv2.VideoCapture", return_value=mock_cap):
+            tvc = ThreadedVideoCapture("rtsp://fake", shm_name=shm_name)
+            time.sleep(0.1)
+            queue = multiprocessing.Queue()
+            # Only the block name crosses the process boundary, never the frame
+            proc = multiprocessing.Process(target=_read_shared_frame_mean, args=(shm_name, queue))
+            proc.start()
+            ret, mean, shape = queue.get(timeout=10)
+            proc.join(timeout=10)
+            tvc.release()
+        assert ret is True
+        assert mean == 42.0
+        assert shape == (240, 320, 3)
+
+    def test_release_unlinks_shared_block(self):
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (True, np.zeros((240, 320, 3), dtype=np.uint8))
+        shm_name = f"babyping-test-{uuid.uuid4().hex[:8]}"
+        with patch("babyping.cv2.VideoCapture", return_value=mock_cap):
+            tvc = ThreadedVideoCapture("rtsp://fake", shm_name=shm_name)
+            time.sleep(0.1)
+            tvc.release()
+        with pytest.raises(FileNotFoundError):
+            SharedFrameReader(shm_name)
+
+    def test_frame_size_change_stops_publishing(self):
+        small = np.full((240, 320, 3), 10, dtype=np.uint8)
+        large = np.full((480, 640, 3), 99, dtype=np.uint8)
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.side_effect = itertools.chain([(True, small)], itertools.repeat((True, large)))
+        shm_name = f"babyping-test-{uuid.uuid4().hex[:8]}"
+        with patch("babyping.cv2.VideoCapture", return_value=mock_cap):
+            tvc = ThreadedVideoCapture("rtsp://fake", shm_name=shm_name)
+            time.sleep(0.1)
+            # The local reader follows the camera; the block keeps the last frame it could hold
+            ret, local = tvc.read()
+            assert local.shape == (480, 640, 3)
+            reader = SharedFrameReader(shm_name)
+            ret, shared = reader.read()
+            assert ret is True
+            assert shared.shape == (240, 320, 3)
+            assert shared.mean() == 10.0
+            del shared
+            reader.close()
+            tvc.release()
+
+    def test_blocked_read_unlinks_block_when_it_returns(self):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        unblock = threading.Event()
+        reads = itertools.count()
+
+        def read():
+            # The second read hangs like a stalled RTSP stream until the test lets it go
+            if next(reads):
+                unblock.wait(5)
+            return True, frame
+
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.side_effect = read
+        shm_name = f"babyping-test-{uuid.uuid4().hex[:8]}"
+        with patch("babyping.cv2.VideoCapture", return_value=mock_cap), \
+                patch.object(ThreadedVideoCapture, "_join_timeout", 0.05):
+            tvc = ThreadedVideoCapture("rtsp://fake", shm_name=shm_name)
+            time.sleep(0.1)
+            tvc.release()
+        # The reader is still blocked, so the block stays until its read returns
+        SharedFrameReader(shm_name).close()
+        unblock.set()
+        tvc._thread.join(timeout=2.0)
+        assert not tvc._thread.is_alive()
+        with pytest.raises(FileNotFoundError):
+            SharedFrameReader(shm_name)
+
+
 # --- open_camera_source tests ---
 
 class TestOpenCameraSource:
@@ -932,31 +1324,50 @@ class TestOpenCameraSource:
 # --- parse_args RTSP tests ---
 
 class TestParseArgsRtsp:
-    def test_camera_accepts_rtsp_url(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--camera", "rtsp://192.168.1.100/stream"])
-        args = parse_args()
+    def test_camera_accepts_rtsp_url(self):
+        args = parse_args(["--camera", "rtsp://192.168.1.100/stream"])
         assert args.camera == "rtsp://192.168.1.100/stream"
 
-    def test_camera_default_is_string_zero(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_camera_default_is_string_zero(self):
+        args = parse_args([])
         assert args.camera == "0"
         assert isinstance(args.camera, str)
 
-    def test_rtsp_transport_default_tcp(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping"])
-        args = parse_args()
+    def test_rtsp_transport_default_tcp(self):
+        args = parse_args([])
         assert args.rtsp_transport == "tcp"
 
-    def test_rtsp_transport_udp(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--rtsp-transport", "udp"])
-        args = parse_args()
+    def test_rtsp_transport_udp(self):
+        args = parse_args(["--rtsp-transport", "udp"])
         assert args.rtsp_transport == "udp"
 
-    def test_rtsp_transport_invalid_rejected(self, monkeypatch):
-        monkeypatch.setattr(sys, "argv", ["babyping", "--rtsp-transport", "invalid"])
+    def test_rtsp_transport_invalid_rejected(self):
         with pytest.raises(SystemExit):
+            parse_args(["--rtsp-transport", "invalid"])
+
+
+class TestParseArgsCachedParser:
+    def test_parser_reused_across_calls(self, monkeypatch):
+        import babyping
+        monkeypatch.setattr(sys, "argv", ["babyping"])
+        with patch("babyping._build_parser") as mock_build:
+            parse_args()
             parse_args()
+        mock_build.assert_not_called()
+        assert isinstance(babyping._PARSER, argparse.ArgumentParser)
+
+    def test_explicit_argv_overrides_sys_argv(self, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["babyping", "--port", "1234"])
+        args = parse_args(["--port", "9000"])
+        assert args.port == 9000
+
+    def test_no_state_leaks_between_calls(self, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["babyping", "--rtsp-transport", "udp", "--no-preview"])
+        parse_args()
+        monkeypatch.setattr(sys, "argv", ["babyping"])
+        args = parse_args()
+        assert args.rtsp_transport == "tcp"
+        assert args.no_preview is False
 
 
 # --- reconnect_camera with RTSP tests ---
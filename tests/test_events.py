@@ -1,13 +1,13 @@
 import json
 import os
-import sys
 import threading
 import time
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unittest.mock import patch
 
 import pytest
-from events import EventLog
+import events
+from events import Event, EventLog
 
 
 @pytest.fixture
@@ -22,6 +22,12 @@ def event_log(tmp_events_file):
     return EventLog(tmp_events_file)
 
 
+@pytest.fixture(params=[True, False], ids=["persist", "memory"])
+def cached_log(request, tmp_events_file):
+    """EventLog for tests that only read back through get_events, with and without a file."""
+    return EventLog(tmp_events_file, persist=request.param)
+
+
 class TestEventLogInit:
     def test_creates_parent_directory(self, tmp_path):
         path = str(tmp_path / "subdir" / "events.jsonl")
@@ -36,6 +42,7 @@ class TestEventLogInit:
 class TestLogEvent:
     def test_log_motion_event(self, event_log, tmp_events_file):
         event_log.log_event("motion", area=1234.5)
+        event_log.flush()
         with open(tmp_events_file) as f:
             line = f.readline()
         data = json.loads(line)
@@ -47,6 +54,7 @@ class TestLogEvent:
 
     def test_log_sound_event(self, event_log, tmp_events_file):
         event_log.log_event("sound", audio_level=0.85)
+        event_log.flush()
         with open(tmp_events_file) as f:
             line = f.readline()
         data = json.loads(line)
@@ -56,6 +64,7 @@ class TestLogEvent:
 
     def test_log_event_with_snapshot(self, event_log, tmp_events_file):
         event_log.log_event("motion", area=500.0, snapshot="2026-02-06T12-00-00.jpg")
+        event_log.flush()
         with open(tmp_events_file) as f:
             data = json.loads(f.readline())
         assert data["snapshot"] == "2026-02-06T12-00-00.jpg"
@@ -63,6 +72,7 @@ class TestLogEvent:
     def test_log_event_with_custom_timestamp(self, event_log, tmp_events_file):
         ts = 1700000000.0
         event_log.log_event("motion", timestamp=ts, area=100.0)
+        event_log.flush()
         with open(tmp_events_file) as f:
             data = json.loads(f.readline())
         assert data["timestamp"] == ts
@@ -71,6 +81,7 @@ class TestLogEvent:
         event_log.log_event("motion", area=100.0)
         event_log.log_event("sound", audio_level=0.5)
         event_log.log_event("motion", area=200.0)
+        event_log.flush()
         with open(tmp_events_file) as f:
             lines = f.readlines()
         assert len(lines) == 3
@@ -79,55 +90,428 @@ class TestLogEvent:
         with pytest.raises(ValueError):
             event_log.log_event("unknown")
 
+    def test_event_type_interned(self, event_log):
+        event_log.log_event("".join(["mot", "ion"]))
+        assert event_log.get_events()[0]["type"] is events.VALID_EVENT_TYPES[0]
+
+    def test_timestamp_defaults_to_now(self, event_log):
+        before = time.time()
+        event_log.log_event("sound")
+        assert event_log.get_events()[0]["timestamp"] >= before
+
+
+class TestEvent:
+    def test_slotted(self):
+        event = Event("motion", 1.0, area=100.0)
+        assert not hasattr(event, "__dict__")
+
+    def test_dict_round_trip(self):
+        data = {"type": "sound", "timestamp": 2.0, "area": None, "audio_level": 0.5, "snapshot": None}
+        assert Event.from_dict(data).to_dict() == data
+
+    def test_from_dict_fills_missing_keys(self):
+        event = Event.from_dict({"type": "motion", "timestamp": 1.0})
+        assert event.area is None
+        assert event.snapshot is None
+
+    def test_non_object_lines_skipped_on_load(self, tmp_events_file):
+        with open(tmp_events_file, "w") as f:
+            f.write("42\n")
+            f.write(json.dumps({"type": "motion", "timestamp": 1.0, "area": 100.0}) + "\n")
+        log = EventLog(tmp_events_file)
+        events = log.get_events()
+        assert len(events) == 1
+        assert events[0]["area"] == 100.0
+
+    @pytest.mark.parametrize("bad_type", [["motion"], {"kind": "motion"}, None, 3])
+    def test_non_string_types_skipped_on_load(self, tmp_events_file, bad_type):
+        with open(tmp_events_file, "w") as f:
+            f.write(json.dumps({"type": bad_type, "timestamp": 0.5}) + "\n")
+            f.write(json.dumps({"type": "motion", "timestamp": 1.0, "area": 100.0}) + "\n")
+        log = EventLog(tmp_events_file)
+        events = log.get_events()
+        assert len(events) == 1
+        assert events[0]["type"] == "motion"
+
+
+class TestStdlibEventEncoder:
+    @pytest.mark.parametrize("event", [
+        Event("motion", 1700000000.123456, area=1234.5),
+        Event("sound", 1700000000.5, audio_level=0.85),
+        Event("motion", 1700000000, area=500.0, snapshot="2026-02-06T12-00-00.jpg"),
+        Event("motion", 1.0, area=100.0, snapshot='we"ird\\name.jpg'),
+        Event("sound", 2.0),
+    ])
+    def test_template_matches_json_dumps(self, event):
+        expected = (json.dumps(event.to_dict()) + "\n").encode()
+        assert events._encode_event_json(event) == expected
+
+    @pytest.mark.parametrize("event", [
+        Event("motion", 1.0, area=float("inf")),
+        Event("motion", 1.0, area=True),
+        Event("sound", 1.0, audio_level=float("nan")),
+        Event("other", 1.0),
+    ])
+    def test_unusual_values_use_generic_encoder(self, event):
+        with patch("events.json.dumps", wraps=json.dumps) as mock_dumps:
+            line = events._encode_event_json(event)
+        mock_dumps.assert_called_once()
+        assert json.loads(line)["type"] == event.type
+
+
+class TestWriteBuffering:
+    def test_events_buffered_until_flush(self, event_log, tmp_events_file):
+        event_log.log_event("motion", area=100.0)
+        assert not os.path.exists(tmp_events_file)
+        event_log.flush()
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 1
+
+    def test_flushes_when_buffer_fills(self, tmp_events_file):
+        log = EventLog(tmp_events_file, flush_bytes=1)
+        written = threading.Event()
+        real_writev = os.writev
+
+        def signal_writev(fd, buffers):
+            n = real_writev(fd, buffers)
+            written.set()
+            return n
+
+        with patch("events.os.writev", side_effect=signal_writev):
+            log.log_event("motion", area=100.0)
+            # The write happens on the writer thread without any flush() call
+            assert written.wait(2)
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 1
+        log.close()
+
+    def test_pending_lines_flushed_after_interval(self, tmp_events_file):
+        log = EventLog(tmp_events_file, flush_interval=0.05)
+        written = threading.Event()
+        real_writev = os.writev
+
+        def signal_writev(fd, buffers):
+            n = real_writev(fd, buffers)
+            written.set()
+            return n
+
+        with patch("events.os.writev", side_effect=signal_writev):
+            log.log_event("motion", area=100.0)
+            assert written.wait(2)
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 1
+        log.close()
+
+    def test_close_cancels_flush_timer(self, event_log):
+        event_log.log_event("motion", area=100.0)
+        timer = event_log._flush_timer
+        event_log.close()
+        timer.join(1)
+        assert not timer.is_alive()
+        assert event_log._flush_timer is None
+
+    def test_buffered_events_visible_to_get_events(self, event_log):
+        event_log.log_event("motion", timestamp=1.0, area=100.0)
+        assert event_log.get_events()[0]["timestamp"] == 1.0
+
+    def test_prune_flushes_first(self, event_log, tmp_events_file):
+        for i in range(10):
+            event_log.log_event("motion", timestamp=float(i), area=float(i))
+        event_log.prune(max_events=5)
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 5
+
+    def test_sync_to_disk_does_not_duplicate_buffered_events(self, event_log, tmp_events_file):
+        event_log.log_event("motion", area=100.0)
+        event_log.sync_to_disk()
+        event_log.flush()
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 1
+
+
+class TestFileDescriptor:
+    def test_flushes_reuse_one_descriptor(self, event_log):
+        with patch("events.os.open", wraps=os.open) as mock_open:
+            for i in range(3):
+                event_log.log_event("motion", area=float(i))
+                event_log.flush()
+        assert mock_open.call_count == 1
+        event_log.close()
+
+    def test_close_flushes_pending_events(self, event_log, tmp_events_file):
+        event_log.log_event("motion", area=100.0)
+        event_log.close()
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 1
+
+    def test_file_size_matches_written_lines(self, event_log, tmp_events_file):
+        event_log.log_event("motion", area=100.0)
+        event_log.flush()
+        with open(tmp_events_file, "rb") as f:
+            data = f.read()
+        assert os.path.getsize(tmp_events_file) == len(data)
+        assert data.endswith(b"\n") and b"\0" not in data
+
+    def test_log_reopens_after_close(self, event_log, tmp_events_file):
+        event_log.log_event("motion", area=100.0)
+        event_log.close()
+        event_log.log_event("motion", area=200.0)
+        event_log.close()
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 2
+
+    def test_appends_after_sync_to_disk_land_after_rewrite(self, tmp_events_file):
+        log = EventLog(tmp_events_file, max_events=2)
+        for i in range(3):
+            log.log_event("motion", timestamp=float(i), area=float(i))
+            log.flush()
+        log.sync_to_disk()
+        log.log_event("motion", timestamp=3.0, area=3.0)
+        log.close()
+        with open(tmp_events_file) as f:
+            timestamps = [json.loads(line)["timestamp"] for line in f]
+        assert timestamps == [1.0, 2.0, 3.0]
+
+
+class TestBackgroundWriter:
+    def test_log_event_does_not_wait_for_disk(self, tmp_events_file):
+        log = EventLog(tmp_events_file, flush_bytes=1)
+        release = threading.Event()
+        # Patching events.os.writev replaces os.writev everywhere, so keep the real one
+        real_writev = os.writev
+
+        def slow_writev(fd, buffers):
+            release.wait(2)
+            return real_writev(fd, buffers)
+
+        with patch("events.os.writev", side_effect=slow_writev):
+            start = time.monotonic()
+            log.log_event("motion", area=100.0)
+            log.log_event("motion", area=200.0)
+            assert time.monotonic() - start < 1
+            release.set()
+            log.flush()
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 2
+        log.close()
+
+    def test_writes_happen_off_the_calling_thread(self, event_log):
+        writers = []
+        real_writev = os.writev
+
+        def record_writev(fd, buffers):
+            writers.append(threading.current_thread().name)
+            return real_writev(fd, buffers)
+
+        with patch("events.os.writev", side_effect=record_writev):
+            event_log.log_event("motion", area=100.0)
+            event_log.flush()
+        assert writers == ["EventLogWriter"]
+        event_log.close()
+
+    def test_short_writes_are_resumed(self, tmp_events_file):
+        log = EventLog(tmp_events_file)
+        real_writev = os.writev
+
+        def short_writev(fd, buffers):
+            # Write at most 7 bytes per call, as a nearly full disk might
+            return real_writev(fd, [bytes(b"".join(buffers)[:7])])
+
+        with patch("events.os.writev", side_effect=short_writev):
+            for i in range(3):
+                log.log_event("motion", timestamp=float(i), area=float(i))
+            log.flush()
+        log.close()
+        with open(tmp_events_file) as f:
+            assert [json.loads(line)["area"] for line in f] == [0.0, 1.0, 2.0]
+
+    def test_short_writes_span_buffers(self, tmp_path):
+        path = tmp_path / "out"
+        real_writev = os.writev
+        calls = []
+
+        def short_writev(fd, buffers):
+            calls.append(len(buffers))
+            return real_writev(fd, [bytes(b"".join(buffers)[:2])])
+
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT)
+        try:
+            with patch("events.os.writev", side_effect=short_writev):
+                events._writev_all(fd, [b"abc", bytearray(b"defg"), b"hi"])
+        finally:
+            os.close(fd)
+        assert path.read_bytes() == b"abcdefghi"
+        # Fully written buffers are dropped from later calls
+        assert calls == [3, 3, 2, 2, 1]
+
+    def test_close_stops_writer_thread(self, event_log):
+        event_log.log_event("motion", area=100.0)
+        event_log.flush()
+        writer = event_log._writer
+        event_log.close()
+        assert not writer.is_alive()
+
+    def test_no_writer_started_without_writes(self, event_log):
+        event_log.flush()
+        event_log.close()
+        assert event_log._writer is None
+
+    def test_flush_survives_unexpected_write_error(self, event_log, tmp_events_file):
+        with patch("events.os.writev", side_effect=ValueError("boom")):
+            event_log.log_event("motion", area=100.0)
+            event_log.flush()  # Must return rather than wait on the marker forever
+        event_log.log_event("motion", area=200.0)
+        event_log.flush()
+        with open(tmp_events_file) as f:
+            assert [json.loads(line)["area"] for line in f] == [200.0]
+        event_log.close()
+
+    def test_flush_restarts_dead_writer(self, event_log, tmp_events_file):
+        event_log.log_event("motion", area=100.0)
+        event_log.flush()
+        # Simulate the writer thread having died
+        event_log._write_queue.put(None)
+        event_log._writer.join()
+        event_log.log_event("motion", area=200.0)
+        event_log.flush()
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 2
+        event_log.close()
+
+
+class TestCommit:
+    def test_log_event_does_not_fsync(self, event_log):
+        with patch("events.os.fsync") as mock_fsync:
+            event_log.log_event("motion", area=100.0)
+            event_log.flush()
+        mock_fsync.assert_not_called()
+        event_log.close()
+
+    def test_commit_writes_and_fsyncs(self, event_log, tmp_events_file):
+        event_log.log_event("motion", area=100.0)
+        with patch("events.os.fsync") as mock_fsync:
+            event_log.commit()
+        mock_fsync.assert_called_once_with(event_log._fd)
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 1
+        event_log.close()
+
+    def test_commit_without_writes(self, event_log):
+        with patch("events.os.fsync") as mock_fsync:
+            event_log.commit()
+        mock_fsync.assert_not_called()
+
+
+class TestMemoryOnly:
+    def test_never_touches_the_file(self, tmp_path):
+        path = tmp_path / "subdir" / "events.jsonl"
+        log = EventLog(str(path), persist=False)
+        log.log_event("motion", area=100.0)
+        log.flush()
+        log.sync_to_disk()
+        log.prune(max_events=1)
+        log.close()
+        assert not (tmp_path / "subdir").exists()
+
+    def test_ignores_existing_file(self, tmp_events_file):
+        with open(tmp_events_file, "w") as f:
+            f.write(json.dumps({"type": "motion", "timestamp": 1.0}) + "\n")
+        log = EventLog(tmp_events_file, persist=False)
+        assert log.get_events() == []
+
+
+class TestJsonFallback:
+    def test_stdlib_json_used_without_orjson(self, tmp_events_file, monkeypatch):
+        """Without orjson, events still round-trip through the stdlib encoder."""
+        monkeypatch.setattr(events, "_encode_event", events._encode_event_json)
+        monkeypatch.setattr(events, "_loads", json.loads)
+        log = EventLog(tmp_events_file)
+        log.log_event("motion", timestamp=1.0, area=100.0)
+        log.flush()
+        reloaded = EventLog(tmp_events_file)
+        assert reloaded.get_events()[0]["area"] == 100.0
+        with open(tmp_events_file) as f:
+            assert json.loads(f.readline())["type"] == "motion"
+
 
 class TestGetEvents:
-    def test_get_events_empty(self, event_log):
-        events = event_log.get_events()
+    def test_get_events_empty(self, cached_log):
+        events = cached_log.get_events()
         assert events == []
 
-    def test_get_events_returns_newest_first(self, event_log):
-        event_log.log_event("motion", timestamp=1.0, area=100.0)
-        event_log.log_event("motion", timestamp=2.0, area=200.0)
-        event_log.log_event("motion", timestamp=3.0, area=300.0)
-        events = event_log.get_events()
+    def test_get_events_returns_newest_first(self, cached_log):
+        cached_log.log_event("motion", timestamp=1.0, area=100.0)
+        cached_log.log_event("motion", timestamp=2.0, area=200.0)
+        cached_log.log_event("motion", timestamp=3.0, area=300.0)
+        events = cached_log.get_events()
         assert events[0]["timestamp"] == 3.0
         assert events[-1]["timestamp"] == 1.0
 
-    def test_get_events_limit(self, event_log):
+    def test_get_events_limit(self, cached_log):
         for i in range(10):
-            event_log.log_event("motion", timestamp=float(i), area=float(i))
-        events = event_log.get_events(limit=3)
+            cached_log.log_event("motion", timestamp=float(i), area=float(i))
+        events = cached_log.get_events(limit=3)
         assert len(events) == 3
         assert events[0]["timestamp"] == 9.0
 
-    def test_get_events_offset(self, event_log):
+    def test_get_events_offset(self, cached_log):
         for i in range(10):
-            event_log.log_event("motion", timestamp=float(i), area=float(i))
-        events = event_log.get_events(limit=3, offset=2)
+            cached_log.log_event("motion", timestamp=float(i), area=float(i))
+        events = cached_log.get_events(limit=3, offset=2)
         assert len(events) == 3
         # Newest first: 9,8,7,6,5... offset 2 skips 9,8 -> returns 7,6,5
         assert events[0]["timestamp"] == 7.0
 
-    def test_get_events_filter_by_type(self, event_log):
-        event_log.log_event("motion", timestamp=1.0, area=100.0)
-        event_log.log_event("sound", timestamp=2.0, audio_level=0.5)
-        event_log.log_event("motion", timestamp=3.0, area=200.0)
-        motion_events = event_log.get_events(event_type="motion")
+    def test_get_events_filter_by_type(self, cached_log):
+        cached_log.log_event("motion", timestamp=1.0, area=100.0)
+        cached_log.log_event("sound", timestamp=2.0, audio_level=0.5)
+        cached_log.log_event("motion", timestamp=3.0, area=200.0)
+        motion_events = cached_log.get_events(event_type="motion")
         assert len(motion_events) == 2
         assert all(e["type"] == "motion" for e in motion_events)
 
-        sound_events = event_log.get_events(event_type="sound")
+        sound_events = cached_log.get_events(event_type="sound")
         assert len(sound_events) == 1
         assert sound_events[0]["type"] == "sound"
 
+    def test_only_requested_page_is_converted(self, cached_log):
+        for i in range(100):
+            cached_log.log_event("motion", timestamp=float(i), area=float(i))
+        with patch.object(Event, "to_dict", autospec=True, side_effect=Event.to_dict) as mock_to_dict:
+            page = cached_log.get_events(limit=3, offset=5)
+        assert [e["timestamp"] for e in page] == [94.0, 93.0, 92.0]
+        assert mock_to_dict.call_count == 3
+
+    def test_negative_limit_and_offset_clamped(self, cached_log):
+        cached_log.log_event("motion", timestamp=1.0, area=100.0)
+        assert cached_log.get_events(limit=-1) == []
+        assert len(cached_log.get_events(offset=-5)) == 1
+
+    def test_filter_by_type_after_eviction(self, tmp_events_file):
+        log = EventLog(tmp_events_file, max_events=4)
+        log.log_event("motion", timestamp=1.0, area=100.0)
+        log.log_event("motion", timestamp=2.0, area=100.0)
+        for i in range(3):
+            log.log_event("sound", timestamp=3.0 + i, audio_level=0.5)
+        motion_events = log.get_events(event_type="motion")
+        assert [e["timestamp"] for e in motion_events] == [2.0]
+        assert len(log.get_events(event_type="sound")) == 3
+
+    def test_filter_by_type_with_loaded_events(self, tmp_events_file):
+        with open(tmp_events_file, "w") as f:
+            f.write(json.dumps({"type": "sound", "timestamp": 1.0, "audio_level": 0.5}) + "\n")
+        log = EventLog(tmp_events_file)
+        log.log_event("motion", timestamp=2.0, area=100.0)
+        assert [e["timestamp"] for e in log.get_events(event_type="sound")] == [1.0]
+
     def test_get_events_no_file(self, tmp_path):
         path = str(tmp_path / "nonexistent.jsonl")
         log = EventLog(path)
         assert log.get_events() == []
 
-    def test_get_events_offset_beyond_end(self, event_log):
-        event_log.log_event("motion", timestamp=1.0, area=100.0)
-        events = event_log.get_events(offset=10)
+    def test_get_events_offset_beyond_end(self, cached_log):
+        cached_log.log_event("motion", timestamp=1.0, area=100.0)
+        events = cached_log.get_events(offset=10)
         assert events == []
 
 
@@ -155,6 +539,55 @@ class TestPrune:
         events = event_log.get_events(limit=100)
         assert len(events) == 3
 
+    def test_prune_leaves_no_temp_file(self, event_log, tmp_events_file):
+        for i in range(10):
+            event_log.log_event("motion", timestamp=float(i), area=float(i))
+        event_log.prune(max_events=5)
+        assert not os.path.exists(tmp_events_file + ".tmp")
+
+    def test_prune_replaces_stale_temp_file(self, event_log, tmp_events_file):
+        for i in range(10):
+            event_log.log_event("motion", timestamp=float(i), area=float(i))
+        with open(tmp_events_file + ".tmp", "w") as f:
+            f.write("stale\n")
+        event_log.prune(max_events=5)
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 5
+
+    def test_appends_after_prune_reach_new_file(self, event_log, tmp_events_file):
+        for i in range(10):
+            event_log.log_event("motion", timestamp=float(i), area=float(i))
+        event_log.prune(max_events=5)
+        event_log.log_event("motion", timestamp=10.0, area=10.0)
+        event_log.flush()
+        with open(tmp_events_file) as f:
+            timestamps = [json.loads(line)["timestamp"] for line in f]
+        assert timestamps == [5.0, 6.0, 7.0, 8.0, 9.0, 10.0]
+
+    def test_prune_keeps_file_lines_beyond_cache(self, tmp_events_file):
+        log = EventLog(tmp_events_file, max_events=10)
+        for i in range(50):
+            log.log_event("motion", timestamp=float(i), area=float(i))
+        log.prune(max_events=40)
+        with open(tmp_events_file) as f:
+            timestamps = [json.loads(line)["timestamp"] for line in f]
+        assert timestamps == [float(i) for i in range(10, 50)]
+
+    def test_prune_zero_keeps_everything(self, event_log, tmp_events_file):
+        for i in range(5):
+            event_log.log_event("motion", timestamp=float(i), area=float(i))
+        event_log.flush()
+        event_log.prune(max_events=0)
+        with open(tmp_events_file) as f:
+            assert len(f.readlines()) == 5
+
+    def test_prune_handles_missing_trailing_newline(self, event_log, tmp_events_file):
+        with open(tmp_events_file, "w") as f:
+            f.write("\n".join(json.dumps({"type": "motion", "timestamp": float(i)}) for i in range(4)))
+        event_log.prune(max_events=2)
+        with open(tmp_events_file) as f:
+            assert [json.loads(line)["timestamp"] for line in f] == [2.0, 3.0]
+
     def test_prune_empty_file(self, event_log):
         event_log.prune(max_events=5)  # Should not raise
         assert event_log.get_events() == []
@@ -186,6 +619,25 @@ class TestThreadSafety:
         events = event_log.get_events(limit=200)
         assert len(events) == 100
 
+    def test_concurrent_writes_produce_whole_lines(self, tmp_events_file):
+        log = EventLog(tmp_events_file, flush_bytes=1)
+
+        def writer(event_type):
+            for i in range(50):
+                log.log_event(event_type, timestamp=float(i))
+
+        threads = [threading.Thread(target=writer, args=(t,)) for t in ("motion", "sound", "motion", "sound")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        log.close()
+
+        with open(tmp_events_file) as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == 200
+        assert sum(r["type"] == "sound" for r in records) == 100
+
 
 class TestInMemoryCache:
     def test_get_events_reads_from_memory(self, tmp_events_file):
@@ -193,6 +645,7 @@ class TestInMemoryCache:
         log = EventLog(tmp_events_file)
         log.log_event("motion", timestamp=1.0, area=100.0)
         log.log_event("motion", timestamp=2.0, area=200.0)
+        log.flush()
 
         # Delete the file — get_events should still work from memory
         os.remove(tmp_events_file)
@@ -214,9 +667,31 @@ class TestInMemoryCache:
         assert events[0]["timestamp"] == 2.0
         assert events[1]["timestamp"] == 1.0
 
-    def test_deque_auto_prunes_at_maxlen(self, tmp_events_file):
+    def test_load_keeps_newest_when_file_exceeds_max_events(self, tmp_events_file):
+        with open(tmp_events_file, "w") as f:
+            for i in range(10):
+                f.write(json.dumps({"type": "motion", "timestamp": float(i), "area": 1.0}) + "\n")
+        log = EventLog(tmp_events_file, max_events=3)
+        timestamps = [e["timestamp"] for e in log.get_events(limit=100)]
+        assert timestamps == [9.0, 8.0, 7.0]
+
+    def test_load_handles_blank_lines_and_missing_trailing_newline(self, tmp_events_file):
+        with open(tmp_events_file, "w") as f:
+            f.write(json.dumps({"type": "motion", "timestamp": 1.0}) + "\n\n")
+            f.write("not json\n")
+            f.write(json.dumps({"type": "sound", "timestamp": 2.0}))
+        log = EventLog(tmp_events_file)
+        timestamps = [e["timestamp"] for e in log.get_events()]
+        assert timestamps == [2.0, 1.0]
+
+    def test_load_empty_file(self, tmp_events_file):
+        open(tmp_events_file, "w").close()
+        assert EventLog(tmp_events_file).get_events() == []
+
+    @pytest.mark.parametrize("persist", [True, False], ids=["persist", "memory"])
+    def test_deque_auto_prunes_at_maxlen(self, tmp_events_file, persist):
         """Deque should auto-prune old events when max_events is reached."""
-        log = EventLog(tmp_events_file, max_events=5)
+        log = EventLog(tmp_events_file, max_events=5, persist=persist)
         for i in range(10):
             log.log_event("motion", timestamp=float(i), area=float(i))
 
@@ -252,9 +727,11 @@ class TestInMemoryCache:
         events_file = str(tmp_path / "events.jsonl")
         log = EventLog(events_file)
         log.log_event("motion", area=100.0)
+        log.flush()
         os.chmod(events_file, 0o444)
         try:
             log.log_event("motion", area=200.0)
+            log.flush()
             events = log.get_events()
             assert len(events) == 2
         finally:
@@ -266,10 +743,16 @@ class TestDiskErrorHandling:
         """log_event should not raise when disk write fails."""
         events_file = str(tmp_path / "events.jsonl")
         log = EventLog(events_file)
-        # Make the file read-only to simulate disk error
-        log.log_event("motion", area=100.0)  # First write succeeds
-        os.chmod(events_file, 0o444)
-        try:
-            log.log_event("motion", area=200.0)  # Should not raise
-        finally:
-            os.chmod(events_file, 0o644)  # Restore for cleanup
+        log.log_event("motion", area=100.0)
+        log.flush()  # First write succeeds
+        # The descriptor stays open between flushes, so fail the write itself
+        with patch("os.writev", side_effect=OSError(28, "No space left on device")) as mock_writev:
+            log.log_event("motion", area=200.0)
+            log.flush()  # Should not raise
+        mock_writev.assert_called_once()
+        assert [e["area"] for e in log.get_events()] == [200.0, 100.0]
+        # The failed batch is dropped, but the writer carries on with the next one
+        log.log_event("motion", area=300.0)
+        log.close()
+        with open(events_file) as f:
+            assert [json.loads(line)["area"] for line in f] == [100.0, 300.0]
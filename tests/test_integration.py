@@ -2,32 +2,47 @@
 
 These tests exercise the full main() function with mocked hardware/OS
 dependencies (camera, display, audio, osascript notifications) and real
-FrameBuffer + EventLog instances. The loop is controlled by raising
+FrameBuffer + memory-only EventLog instances. The loop is controlled by raising
 KeyboardInterrupt from cap.read() after the desired frames.
 """
 
 import argparse
-import os
+import functools
+import itertools
 import sys
+import threading
 import time
+import types
+from contextlib import ExitStack
 
 import cv2
 import numpy as np
 import pytest
 from unittest.mock import MagicMock, patch, call, PropertyMock
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+import babyping
 from babyping import FrameBuffer, SENSITIVITY_THRESHOLDS
+from events import EventLog
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=None)
+def _frame_template(value, width, height):
+    frame = np.full((height, width, 3), value, dtype=np.uint8)
+    frame.setflags(write=False)
+    return frame
+
+
 def make_frame(value=128, width=320, height=240):
-    """Return a 3-channel BGR frame filled with *value*."""
-    return np.full((height, width, 3), value, dtype=np.uint8)
+    """Return a 3-channel BGR frame filled with *value*.
+
+    Each call gets its own writable copy of a cached template, since main()
+    draws motion contours and the ROI rectangle into the frames it reads.
+    """
+    return _frame_template(value, width, height).copy()
 
 
 def make_fake_args(**overrides):
@@ -56,47 +71,95 @@ def make_fake_args(**overrides):
     return argparse.Namespace(**defaults)
 
 
-def _make_cap(frames):
-    """Build a mock VideoCapture that yields *frames* then raises KeyboardInterrupt."""
-    cap = MagicMock()
-    reads = [(True, f) for f in frames]
+def _reads_then_interrupt(reads):
+    """Return a cap.read side effect that serves *reads* in order, then raises KeyboardInterrupt."""
+    reads = iter(reads)
 
     def read_side_effect():
-        if reads:
-            return reads.pop(0)
-        raise KeyboardInterrupt
+        result = next(reads, None)
+        if result is None:
+            raise KeyboardInterrupt
+        return result
 
-    cap.read.side_effect = read_side_effect
+    return read_side_effect
+
+
+def _make_cap(frames):
+    """Build a mock VideoCapture that yields *frames* then raises KeyboardInterrupt."""
+    cap = MagicMock(spec=cv2.VideoCapture)
+    cap.read.side_effect = _reads_then_interrupt((True, f) for f in frames)
     cap.isOpened.return_value = True
     return cap
 
 
-def _motion_pair(value_a=0, value_b=255):
-    """Return two frames guaranteed to trigger motion at medium sensitivity."""
-    a = make_frame(value=value_a)
+@functools.lru_cache(maxsize=None)
+def _motion_pair_template(value_a, value_b):
     b = make_frame(value=value_a)
     b[20:220, 20:300] = value_b
-    return a, b
+    b.setflags(write=False)
+    return _frame_template(value_a, 320, 240), b
+
+
+def _motion_pair(value_a=0, value_b=255):
+    """Return two frames guaranteed to trigger motion at medium sensitivity."""
+    a, b = _motion_pair_template(value_a, value_b)
+    return a.copy(), b.copy()
+
+
+# The AudioMonitor methods main() calls; speccing to these rather than the real
+# class keeps the mock from growing other attributes without importing audio.py
+_AUDIO_MONITOR_METHODS = ("start", "stop", "is_alive", "get_level", "get_last_sound_time")
 
 
 def _make_audio_monitor(level=0.0, last_sound_time=None, alive=True):
     """Create a mock AudioMonitor."""
-    monitor = MagicMock()
+    monitor = MagicMock(spec_set=_AUDIO_MONITOR_METHODS)
     monitor.get_level.return_value = level
     monitor.get_last_sound_time.return_value = last_sound_time
     monitor.is_alive.return_value = alive
-    monitor.start.return_value = None
-    monitor.stop.return_value = None
     return monitor
 
 
+# JPEG SOI/APP0 markers plus padding: shaped like cv2.imencode output, but never encoded
+_STUB_JPEG = np.frombuffer(b"\xff\xd8\xff\xe0" + b"\x00" * 128, np.uint8)
+
+
+@pytest.fixture
+def stub_imencode():
+    """Patch cv2.imencode to return _STUB_JPEG, for tests that only follow the bytes."""
+    with patch("cv2.imencode", return_value=(True, _STUB_JPEG)) as mock_encode:
+        yield mock_encode
+
+
+@pytest.fixture
+def mock_event_log():
+    """A mock EventLog; pass it to MainRunner(event_log=...) to have main() use it."""
+    return MagicMock(spec=EventLog)
+
+
 class MainRunner:
     """Context manager that runs main() with all hardware mocked out."""
 
-    def __init__(self, args, frames, *, audio_monitor=None, cap=None):
+    # (mock name, patch target) for everything main() touches outside the process
+    _TARGETS = (
+        ("parse_args", "babyping.parse_args"),
+        ("open_camera_source", "babyping.open_camera_source"),
+        ("send_notification", "babyping.send_notification"),
+        ("start_web_server", "babyping.start_web_server"),
+        ("imshow", "cv2.imshow"),
+        ("waitKey", "cv2.waitKey"),
+        ("destroyAllWindows", "cv2.destroyAllWindows"),
+        ("destroyWindow", "cv2.destroyWindow"),
+        ("selectROI", "cv2.selectROI"),
+        ("get_local_ip", "babyping.get_local_ip"),
+        ("get_tailscale_ip", "babyping.get_tailscale_ip"),
+    )
+
+    def __init__(self, args, frames, *, audio_monitor=None, event_log=None, cap=None):
         self.args = args
         self.frames = frames
         self.audio_monitor = audio_monitor
+        self.event_log = event_log
         self._custom_cap = cap
 
         self.mock_notification = None
@@ -104,41 +167,26 @@ class MainRunner:
         self.mock_open_camera_source = None
         self.mock_destroyAllWindows = None
         self.mock_web_thread = None
+        self.mock_event_log_cls = None
         self.cap = None
         self.frame_buffer = None
-        self._patches = {}
+        self._stack = None
         self._mocks = {}
 
     def __enter__(self):
-        import babyping
-
         self.frame_buffer = babyping.frame_buffer
+        # Re-running __init__ costs a couple of microseconds and, unlike restoring
+        # saved slot values, also replaces a lock a failed test may have left held
         self.frame_buffer.__init__()
 
         self.cap = self._custom_cap or _make_cap(self.frames)
 
-        self.mock_web_thread = MagicMock()
+        self.mock_web_thread = MagicMock(spec=threading.Thread)
         self.mock_web_thread.daemon = True
         self.mock_web_thread.is_alive.return_value = True
 
-        targets = {
-            "parse_args": "babyping.parse_args",
-            "open_camera_source": "babyping.open_camera_source",
-            "send_notification": "babyping.send_notification",
-            "start_web_server": "babyping.start_web_server",
-            "imshow": "cv2.imshow",
-            "waitKey": "cv2.waitKey",
-            "destroyAllWindows": "cv2.destroyAllWindows",
-            "destroyWindow": "cv2.destroyWindow",
-            "selectROI": "cv2.selectROI",
-            "get_local_ip": "babyping.get_local_ip",
-            "get_tailscale_ip": "babyping.get_tailscale_ip",
-        }
-        for name, target in targets.items():
-            p = patch(target)
-            self._patches[name] = p
-
-        mocks = {name: p.start() for name, p in self._patches.items()}
+        self._stack = ExitStack()
+        mocks = {name: self._stack.enter_context(patch(target)) for name, target in self._TARGETS}
 
         mocks["parse_args"].return_value = self.args
         mocks["open_camera_source"].return_value = self.cap
@@ -156,28 +204,37 @@ class MainRunner:
         self.mock_destroyAllWindows = mocks["destroyAllWindows"]
         self._mocks = mocks
 
+        if self.event_log is not None:
+            self.mock_event_log_cls = self._stack.enter_context(
+                patch("events.EventLog", return_value=self.event_log))
+        else:
+            # A memory-only log keeps runs out of ~/.babyping, so test processes
+            # never share (or pollute) the user's event file
+            self._stack.enter_context(patch("events.EventLog", functools.partial(EventLog, persist=False)))
+
         if self.audio_monitor is not None:
-            self._audio_patch = patch("audio.AudioMonitor", return_value=self.audio_monitor)
-            self._audio_patch.start()
+            # main() does "from audio import AudioMonitor"; a stub module in sys.modules
+            # answers that without importing audio.py, which needs PortAudio via sounddevice
+            audio_stub = types.ModuleType("audio")
+            audio_stub.AudioMonitor = MagicMock(return_value=self.audio_monitor)
+            self._stack.enter_context(patch.dict(sys.modules, {"audio": audio_stub}))
             self.args.no_audio = False
-        else:
-            self._audio_patch = None
 
         return self
 
     def run(self):
-        from babyping import main
-        main()
+        babyping.main()
         return self
 
     def __exit__(self, *exc):
-        for p in self._patches.values():
-            p.stop()
-        if self._audio_patch is not None:
-            self._audio_patch.stop()
+        self._stack.close()
 
-    def notification_messages(self):
-        return [(c.args[0], c.args[1]) for c in self.mock_notification.call_args_list]
+    def count_messages(self, substring, *, ignore_case=False):
+        """Count notifications whose message contains *substring*, in one pass."""
+        if ignore_case:
+            substring = substring.lower()
+            return sum(substring in c.args[1].lower() for c in self.mock_notification.call_args_list)
+        return sum(substring in c.args[1] for c in self.mock_notification.call_args_list)
 
     def notification_count(self):
         return self.mock_notification.call_count
@@ -189,14 +246,14 @@ class MainRunner:
 
 class TestMotionPipeline:
 
-    def test_motion_triggers_notification(self):
+    @pytest.mark.parametrize("enabled, expected", [(True, 1), (False, 0)], ids=["on", "off"])
+    def test_motion_notification_follows_alert_toggle(self, enabled, expected):
         a, b = _motion_pair()
         args = make_fake_args()
         with MainRunner(args, [a, b]) as r:
+            r.frame_buffer.set_motion_alerts_enabled(enabled)
             r.run()
-            msgs = r.notification_messages()
-            motion_msgs = [m for _, m in msgs if "Motion detected" in m]
-            assert len(motion_msgs) >= 1
+            assert r.count_messages("Motion detected") == expected
 
     def test_motion_cooldown_suppresses_second_alert(self):
         a, b = _motion_pair()
@@ -204,8 +261,7 @@ class TestMotionPipeline:
         args = make_fake_args(cooldown=30)
         with MainRunner(args, [still, b, still, b]) as r:
             r.run()
-            motion_msgs = [m for _, m in r.notification_messages() if "Motion detected" in m]
-            assert len(motion_msgs) == 1
+            assert r.count_messages("Motion detected") == 1
 
     def test_motion_cooldown_allows_after_expiry(self):
         a, b = _motion_pair()
@@ -220,77 +276,47 @@ class TestMotionPipeline:
         with MainRunner(args, frames) as r:
             # Simulate a viewer so frame_buffer.update() runs (which calls time.time)
             r.frame_buffer.get()
-            time_calls = [0]
+            # After enough calls (motion detection done for first event),
+            # jump past cooldown for the second motion event. A plain callable
+            # over an iterator avoids mock call tracking on every time.time().
             base = 1000.0
+            clock = itertools.chain(itertools.repeat(base, 5), itertools.repeat(base + 35))
 
-            def fake_time():
-                time_calls[0] += 1
-                # After enough calls (motion detection done for first event),
-                # jump past cooldown for the second motion event
-                if time_calls[0] > 5:
-                    return base + 35
-                return base
-
-            with patch("babyping.time.time", side_effect=fake_time):
+            with patch("babyping.time.time", new=functools.partial(next, clock)):
                 r.run()
 
-            motion_msgs = [m for _, m in r.notification_messages() if "Motion detected" in m]
-            assert len(motion_msgs) == 2
+            assert r.count_messages("Motion detected") == 2
 
-    def test_motion_logs_event_with_area(self):
+    def test_motion_logs_event_with_area(self, mock_event_log):
         a, b = _motion_pair()
         args = make_fake_args()
 
-        with MainRunner(args, [a, b]) as r:
-            with patch("events.EventLog") as MockLog:
-                mock_log = MagicMock()
-                MockLog.return_value = mock_log
-                r.run()
-                motion_calls = [c for c in mock_log.log_event.call_args_list
-                                if c.args[0] == "motion"]
-                assert len(motion_calls) >= 1
-                assert motion_calls[0].kwargs.get("area", 0) > 0
+        with MainRunner(args, [a, b], event_log=mock_event_log) as r:
+            r.run()
+        motion_calls = [c for c in mock_event_log.log_event.call_args_list
+                        if c.args[0] == "motion"]
+        assert len(motion_calls) >= 1
+        assert motion_calls[0].kwargs.get("area", 0) > 0
 
-    def test_motion_saves_snapshot_when_enabled(self, tmp_path):
+    @pytest.mark.parametrize("snapshots, expected", [(True, 1), (False, 0)], ids=["enabled", "disabled"])
+    def test_motion_snapshot_follows_flag(self, tmp_path, snapshots, expected):
         a, b = _motion_pair()
-        args = make_fake_args(snapshots=True, snapshot_dir=str(tmp_path))
+        args = make_fake_args(snapshots=snapshots, snapshot_dir=str(tmp_path))
 
         with MainRunner(args, [a, b]) as r:
             with patch("babyping.save_snapshot", return_value=str(tmp_path / "snap.jpg")) as mock_save:
                 r.run()
-                assert mock_save.call_count >= 1
-
-    def test_motion_skips_snapshot_when_disabled(self):
-        a, b = _motion_pair()
-        args = make_fake_args(snapshots=False)
-
-        with MainRunner(args, [a, b]) as r:
-            with patch("babyping.save_snapshot") as mock_save:
-                r.run()
-                mock_save.assert_not_called()
+                assert mock_save.call_count == expected
 
-    def test_motion_alert_suppressed_when_toggle_off(self):
-        a, b = _motion_pair()
-        args = make_fake_args()
-
-        with MainRunner(args, [a, b]) as r:
-            r.frame_buffer.set_motion_alerts_enabled(False)
-            r.run()
-            motion_msgs = [m for _, m in r.notification_messages() if "Motion detected" in m]
-            assert len(motion_msgs) == 0
-
-    def test_max_events_passed_to_event_log(self):
+    def test_max_events_passed_to_event_log(self, mock_event_log):
         """EventLog is initialized with max_events from args for deque auto-pruning."""
         a, b = _motion_pair()
         args = make_fake_args(max_events=5)
 
-        with MainRunner(args, [a, b]) as r:
-            with patch("events.EventLog") as MockLog:
-                mock_log = MagicMock()
-                MockLog.return_value = mock_log
-                r.run()
-                # Verify EventLog was created with max_events
-                MockLog.assert_called_once_with(max_events=5)
+        with MainRunner(args, [a, b], event_log=mock_event_log) as r:
+            r.run()
+        # Verify EventLog was created with max_events
+        r.mock_event_log_cls.assert_called_once_with(max_events=5)
 
 
 # ---------------------------------------------------------------------------
@@ -299,17 +325,16 @@ class TestMotionPipeline:
 
 class TestSoundPipeline:
 
-    def test_sound_triggers_notification(self):
+    @pytest.mark.parametrize("enabled, expected", [(True, 1), (False, 0)], ids=["on", "off"])
+    def test_sound_notification_follows_alert_toggle(self, enabled, expected):
         still = make_frame(value=128)
-        sound_time = time.time()
-        audio = _make_audio_monitor(level=0.5, last_sound_time=sound_time)
+        audio = _make_audio_monitor(level=0.5, last_sound_time=time.time())
         args = make_fake_args()
 
         with MainRunner(args, [still, still], audio_monitor=audio) as r:
+            r.frame_buffer.set_sound_alerts_enabled(enabled)
             r.run()
-            msgs = r.notification_messages()
-            sound_msgs = [m for _, m in msgs if "Sound detected" in m]
-            assert len(sound_msgs) >= 1
+            assert r.count_messages("Sound detected") == expected
 
     def test_sound_cooldown_suppresses_second_alert(self):
         still = make_frame(value=128)
@@ -319,19 +344,7 @@ class TestSoundPipeline:
 
         with MainRunner(args, [still, still, still], audio_monitor=audio) as r:
             r.run()
-            sound_msgs = [m for _, m in r.notification_messages() if "Sound detected" in m]
-            assert len(sound_msgs) == 1
-
-    def test_sound_alert_suppressed_when_toggle_off(self):
-        still = make_frame(value=128)
-        audio = _make_audio_monitor(level=0.5, last_sound_time=time.time())
-        args = make_fake_args()
-
-        with MainRunner(args, [still, still], audio_monitor=audio) as r:
-            r.frame_buffer.set_sound_alerts_enabled(False)
-            r.run()
-            sound_msgs = [m for _, m in r.notification_messages() if "Sound detected" in m]
-            assert len(sound_msgs) == 0
+            assert r.count_messages("Sound detected") == 1
 
     def test_sound_syncs_audio_level_to_frame_buffer(self):
         still = make_frame(value=128)
@@ -342,19 +355,16 @@ class TestSoundPipeline:
             r.run()
             assert r.frame_buffer.get_audio_level() == 0.75
 
-    def test_sound_logs_event(self):
+    def test_sound_logs_event(self, mock_event_log):
         still = make_frame(value=128)
         audio = _make_audio_monitor(level=0.5, last_sound_time=time.time())
         args = make_fake_args()
 
-        with MainRunner(args, [still, still], audio_monitor=audio) as r:
-            with patch("events.EventLog") as MockLog:
-                mock_log = MagicMock()
-                MockLog.return_value = mock_log
-                r.run()
-                sound_calls = [c for c in mock_log.log_event.call_args_list
-                               if c.args[0] == "sound"]
-                assert len(sound_calls) >= 1
+        with MainRunner(args, [still, still], audio_monitor=audio, event_log=mock_event_log) as r:
+            r.run()
+        sound_calls = [c for c in mock_event_log.log_event.call_args_list
+                       if c.args[0] == "sound"]
+        assert len(sound_calls) >= 1
 
 
 # ---------------------------------------------------------------------------
@@ -365,15 +375,9 @@ class TestCameraReconnection:
 
     def _make_drop_cap(self, good_frames, drop_count):
         """Cap that serves good_frames, then drop_count failures, then KeyboardInterrupt."""
-        cap = MagicMock()
-        reads = [(True, f) for f in good_frames] + [(False, None)] * drop_count
-
-        def read_side():
-            if reads:
-                return reads.pop(0)
-            raise KeyboardInterrupt
-
-        cap.read.side_effect = read_side
+        cap = MagicMock(spec=cv2.VideoCapture)
+        cap.read.side_effect = _reads_then_interrupt(itertools.chain(
+            ((True, f) for f in good_frames), itertools.repeat((False, None), drop_count)))
         cap.isOpened.return_value = True
         return cap
 
@@ -382,7 +386,7 @@ class TestCameraReconnection:
         args = make_fake_args()
         cap = self._make_drop_cap([good], 30)
 
-        reconnected_cap = MagicMock()
+        reconnected_cap = MagicMock(spec=cv2.VideoCapture)
         reconnected_cap.read.side_effect = KeyboardInterrupt
         reconnected_cap.isOpened.return_value = True
 
@@ -407,9 +411,7 @@ class TestCameraReconnection:
                         # finally block calls cap.release() which fails.
                         # This is a known edge case in main().
                         pass
-            msgs = r.notification_messages()
-            failed_msgs = [m for _, m in msgs if "reconnect failed" in m.lower()]
-            assert len(failed_msgs) >= 1
+            assert r.count_messages("reconnect failed", ignore_case=True) >= 1
 
     def test_warns_on_first_dropped_frame(self, capsys):
         good = make_frame(value=128)
@@ -428,7 +430,7 @@ class TestCameraReconnection:
         args = make_fake_args()
         cap = self._make_drop_cap([good], 30)
 
-        reconnected_cap = MagicMock()
+        reconnected_cap = MagicMock(spec=cv2.VideoCapture)
         reconnected_cap.read.side_effect = [(True, different), KeyboardInterrupt]
         reconnected_cap.isOpened.return_value = True
 
@@ -436,15 +438,14 @@ class TestCameraReconnection:
             with patch("babyping.reconnect_camera", return_value=reconnected_cap):
                 with patch("babyping.time.sleep"):
                     r.run()
-                motion_msgs = [m for _, m in r.notification_messages() if "Motion detected" in m]
-                assert len(motion_msgs) == 0
+                assert r.count_messages("Motion detected") == 0
 
     def test_reconnect_success_sends_notification(self):
         good = make_frame(value=128)
         args = make_fake_args()
         cap = self._make_drop_cap([good], 30)
 
-        reconnected_cap = MagicMock()
+        reconnected_cap = MagicMock(spec=cv2.VideoCapture)
         reconnected_cap.read.side_effect = KeyboardInterrupt
         reconnected_cap.isOpened.return_value = True
 
@@ -452,9 +453,7 @@ class TestCameraReconnection:
             with patch("babyping.reconnect_camera", return_value=reconnected_cap):
                 with patch("babyping.time.sleep"):
                     r.run()
-                msgs = r.notification_messages()
-                reconnected_msgs = [m for _, m in msgs if "reconnected" in m.lower()]
-                assert len(reconnected_msgs) >= 1
+                assert r.count_messages("reconnected", ignore_case=True) >= 1
 
 
 # ---------------------------------------------------------------------------
@@ -471,9 +470,7 @@ class TestHealthChecks:
         with MainRunner(args, [still, still], audio_monitor=audio) as r:
             r.run()
             assert r.frame_buffer.get_audio_enabled() is False
-            msgs = r.notification_messages()
-            audio_msgs = [m for _, m in msgs if "audio" in m.lower() or "Audio" in m]
-            assert len(audio_msgs) >= 1
+            assert r.count_messages("audio", ignore_case=True) >= 1
 
     def test_dead_web_server_restarts(self):
         still = make_frame(value=128)
@@ -483,24 +480,15 @@ class TestHealthChecks:
             # First iteration: dead -> restart, subsequent: alive
             r.mock_web_thread.is_alive.side_effect = [False] + [True] * 10
 
-            new_thread = MagicMock()
+            new_thread = MagicMock(spec=threading.Thread)
             new_thread.is_alive.return_value = True
 
             # After the initial start_web_server call (in setup), subsequent
             # calls return the new_thread
-            original_return = r.mock_web_thread
-            call_counter = [0]
-            def start_web_side(*a, **kw):
-                call_counter[0] += 1
-                if call_counter[0] == 1:
-                    return original_return
-                return new_thread
-            r.mock_start_web.side_effect = start_web_side
+            r.mock_start_web.side_effect = itertools.chain([r.mock_web_thread], itertools.repeat(new_thread))
 
             r.run()
-            msgs = r.notification_messages()
-            web_msgs = [m for _, m in msgs if "web server" in m.lower() or "Web server" in m]
-            assert len(web_msgs) >= 1
+            assert r.count_messages("web server", ignore_case=True) >= 1
             assert r.mock_start_web.call_count >= 2
 
     def test_web_server_restart_reuses_flask_app(self):
@@ -512,7 +500,7 @@ class TestHealthChecks:
             dead_thread = r.mock_web_thread
             dead_thread.is_alive.return_value = False
 
-            new_thread = MagicMock()
+            new_thread = MagicMock(spec=threading.Thread)
             new_thread.is_alive.return_value = True
 
             r.mock_start_web.side_effect = [dead_thread, new_thread]
@@ -532,10 +520,8 @@ class TestHealthChecks:
 
         with MainRunner(args, [still, still], audio_monitor=audio) as r:
             r.run()
-            msgs = r.notification_messages()
-            health_msgs = [m for _, m in msgs
-                           if "Audio monitor" in m or "Web server" in m]
-            assert len(health_msgs) == 0
+            assert r.count_messages("Audio monitor") == 0
+            assert r.count_messages("Web server") == 0
             assert r.mock_start_web.call_count == 1
 
 
@@ -563,71 +549,38 @@ class TestDynamicSettings:
         # Area between 500 and 2000
         subtle[50:80, 50:80] = 255  # 30x30 = ~900px area
 
-        cap = MagicMock()
-        frame_idx = [0]
-        frame_list = [(True, still), (True, subtle)]
-
-        def read_side():
-            if frame_idx[0] < len(frame_list):
-                result = frame_list[frame_idx[0]]
-                frame_idx[0] += 1
-                return result
-            raise KeyboardInterrupt
-
-        cap.read.side_effect = read_side
+        cap = MagicMock(spec=cv2.VideoCapture)
+        cap.read.side_effect = _reads_then_interrupt([(True, still), (True, subtle)])
         cap.isOpened.return_value = True
 
         with MainRunner(args, [], cap=cap) as r:
             # After main() sets sensitivity to medium, change it to high
-            # The loop will pick up "high" on the second iteration
-            original_get = r.frame_buffer.get_sensitivity
-
-            get_count = [0]
-            def get_sensitivity_with_switch():
-                get_count[0] += 1
-                # First call is frame 1 (no prev_gray, no motion check)
-                # Second call is frame 2 (motion check with new threshold)
-                if get_count[0] >= 2:
-                    return "high"
-                return "medium"
-
-            r.frame_buffer.get_sensitivity = get_sensitivity_with_switch
-            r.run()
+            # The loop will pick up "high" on the second iteration:
+            # first call is frame 1 (no prev_gray, no motion check),
+            # second call is frame 2 (motion check with new threshold)
+            sensitivities = itertools.chain(["medium"], itertools.repeat("high"))
+
+            with patch.object(FrameBuffer, "get_sensitivity", side_effect=sensitivities):
+                r.run()
 
             # At high sensitivity (500), the subtle change (area ~900) should trigger
-            motion_msgs = [m for _, m in r.notification_messages() if "Motion detected" in m]
-            assert len(motion_msgs) >= 1
+            assert r.count_messages("Motion detected") >= 1
 
     def test_fps_change_mid_run(self):
         """Loop reads fps from frame_buffer each iteration."""
         still = make_frame(value=128)
         args = make_fake_args(fps=10)
 
-        cap = MagicMock()
-        frame_idx = [0]
-        frame_list = [(True, still), (True, still)]
-
-        def read_side():
-            if frame_idx[0] < len(frame_list):
-                result = frame_list[frame_idx[0]]
-                frame_idx[0] += 1
-                return result
-            raise KeyboardInterrupt
-
-        cap.read.side_effect = read_side
+        cap = MagicMock(spec=cv2.VideoCapture)
+        cap.read.side_effect = _reads_then_interrupt([(True, still), (True, still)])
         cap.isOpened.return_value = True
 
         with MainRunner(args, [], cap=cap) as r:
             # main() sets fps=10, then we switch to 30
-            get_count = [0]
-            def get_fps_switch():
-                get_count[0] += 1
-                if get_count[0] >= 2:
-                    return 30
-                return 10
-
-            r.frame_buffer.get_fps = get_fps_switch
-            with patch("babyping.throttle_fps") as mock_throttle:
+            fps_readings = itertools.chain([10], itertools.repeat(30))
+
+            with patch.object(FrameBuffer, "get_fps", side_effect=fps_readings), \
+                 patch("babyping.throttle_fps") as mock_throttle:
                 r.run()
                 # Check that at least one call used fps=30
                 fps_values = [c.args[1] for c in mock_throttle.call_args_list]
@@ -640,33 +593,17 @@ class TestDynamicSettings:
         # Put motion ONLY in bottom-right area (100:200, 100:200)
         motion[100:200, 100:200] = 255
 
-        cap = MagicMock()
-        frame_idx = [0]
-        frame_list = [(True, still), (True, motion)]
-
-        def read_side():
-            if frame_idx[0] < len(frame_list):
-                result = frame_list[frame_idx[0]]
-                frame_idx[0] += 1
-                return result
-            raise KeyboardInterrupt
-
-        cap.read.side_effect = read_side
+        cap = MagicMock(spec=cv2.VideoCapture)
+        cap.read.side_effect = _reads_then_interrupt([(True, still), (True, motion)])
         cap.isOpened.return_value = True
 
         args = make_fake_args()
 
         with MainRunner(args, [], cap=cap) as r:
             # Set ROI to top-left corner only (excludes the motion area)
-            get_count = [0]
-            def get_roi_for_loop():
-                get_count[0] += 1
-                return (0, 0, 50, 50)
-
-            r.frame_buffer.get_roi = get_roi_for_loop
-            r.run()
-            motion_msgs = [m for _, m in r.notification_messages() if "Motion detected" in m]
-            assert len(motion_msgs) == 0
+            with patch.object(FrameBuffer, "get_roi", return_value=(0, 0, 50, 50)):
+                r.run()
+            assert r.count_messages("Motion detected") == 0
 
 
 # ---------------------------------------------------------------------------
@@ -675,7 +612,7 @@ class TestDynamicSettings:
 
 class TestDisplayAndEncoding:
 
-    def test_frame_encoded_to_jpeg_in_buffer(self):
+    def test_frame_encoded_to_jpeg_in_buffer(self, stub_imencode):
         still = make_frame(value=128)
         args = make_fake_args()
 
@@ -686,6 +623,8 @@ class TestDisplayAndEncoding:
             jpeg_bytes = r.frame_buffer.get()
             assert jpeg_bytes is not None
             assert jpeg_bytes[:2] == b'\xff\xd8'
+            assert bytes(jpeg_bytes) == _STUB_JPEG.tobytes()
+            assert stub_imencode.call_args.args[1] is still
 
     def test_night_mode_applied_when_enabled(self):
         dark = make_frame(value=20)
@@ -702,9 +641,10 @@ class TestDisplayAndEncoding:
             r_normal.run()
             normal_bytes = r_normal.frame_buffer.get()
 
-        night_frame = cv2.imdecode(np.frombuffer(night_bytes, np.uint8), cv2.IMREAD_COLOR)
-        normal_frame = cv2.imdecode(np.frombuffer(normal_bytes, np.uint8), cv2.IMREAD_COLOR)
-        assert night_frame.mean() > normal_frame.mean()
+        # Decode as grayscale and compare cv2.mean: one channel, no float64 temporary
+        night_mean = cv2.mean(cv2.imdecode(np.frombuffer(night_bytes, np.uint8), cv2.IMREAD_GRAYSCALE))[0]
+        normal_mean = cv2.mean(cv2.imdecode(np.frombuffer(normal_bytes, np.uint8), cv2.IMREAD_GRAYSCALE))[0]
+        assert night_mean > normal_mean
 
     def test_quit_on_q_key(self):
         still = make_frame(value=128)
@@ -750,42 +690,28 @@ class TestDisplayAndEncoding:
 
 class TestCleanup:
 
-    def test_keyboard_interrupt_cleanup(self, capsys):
+    @pytest.mark.parametrize("with_audio", [False, True], ids=["no_audio", "audio"])
+    @pytest.mark.parametrize("exit_mode", ["interrupt", "quit"])
+    def test_cleanup(self, exit_mode, with_audio, capsys):
         still = make_frame(value=128)
-        args = make_fake_args()
-        cap = MagicMock()
-        cap.read.side_effect = [(True, still), KeyboardInterrupt]
-        cap.isOpened.return_value = True
+        audio = _make_audio_monitor(level=0.0, alive=True) if with_audio else None
+        if exit_mode == "interrupt":
+            args = make_fake_args()
+            cap = MagicMock(spec=cv2.VideoCapture)
+            cap.read.side_effect = [(True, still), KeyboardInterrupt]
+            cap.isOpened.return_value = True
+        else:
+            args = make_fake_args(no_preview=False)
+            cap = _make_cap([still, still])
 
-        with MainRunner(args, [], cap=cap) as r:
+        with MainRunner(args, [], cap=cap, audio_monitor=audio) as r:
+            if exit_mode == "quit":
+                r._mocks["waitKey"].return_value = ord("q")
             r.run()
 
         cap.release.assert_called_once()
         r.mock_destroyAllWindows.assert_called_once()
+        if with_audio:
+            audio.stop.assert_called_once()
         captured = capsys.readouterr()
         assert "stopped" in captured.out.lower()
-
-    def test_audio_monitor_stopped_in_cleanup(self):
-        still = make_frame(value=128)
-        audio = _make_audio_monitor(level=0.0, alive=True)
-        args = make_fake_args()
-        cap = MagicMock()
-        cap.read.side_effect = [(True, still), KeyboardInterrupt]
-        cap.isOpened.return_value = True
-
-        with MainRunner(args, [], cap=cap, audio_monitor=audio) as r:
-            r.run()
-
-        audio.stop.assert_called_once()
-
-    def test_normal_exit_cleanup(self):
-        still = make_frame(value=128)
-        args = make_fake_args(no_preview=False)
-        cap = _make_cap([still, still])
-
-        with MainRunner(args, [], cap=cap) as r:
-            r._mocks["waitKey"].return_value = ord("q")
-            r.run()
-
-        cap.release.assert_called_once()
-        r.mock_destroyAllWindows.assert_called_once()
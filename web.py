@@ -1,10 +1,44 @@
-import glob
+import hashlib
 import os
-import time
+import re
 
 from flask import Flask, Response, jsonify, request, send_from_directory
 
-from babyping import get_tailscale_ip
+from babyping import get_tailscale_ip, list_snapshots
+
+# orjson is optional, as in events.py; Flask's jsonify covers the rest
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Each part ends with the next boundary: browsers show a part only once they see
+# the boundary after it, so a trailing boundary puts the frame on screen at once
+_BOUNDARY = b"--frame\r\n"
+_PART_HEADER = b"Content-Type: image/jpeg\r\n\r\n"
+_PART_TRAILER = b"\r\n" + _BOUNDARY
+
+# With no new frame for this long, /stream resends the last one. The write is what
+# tells waitress a viewer has gone, freeing its worker even while the camera is stalled.
+STREAM_KEEPALIVE = 1.0
+
+
+def _json_response(payload):
+    """Return payload as a JSON response, encoded by orjson when it is installed."""
+    if orjson is None:
+        return jsonify(payload)
+    return Response(orjson.dumps(payload), mimetype="application/json")
+
+
+def _revalidated(response):
+    """Tag response with a content ETag, answering 304 if the client already has it.
+
+    no-cache makes the browser revalidate every poll instead of trusting a stale copy.
+    """
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 def create_app(args, frame_buffer=None, event_log=None):
@@ -24,19 +58,28 @@ def create_app(args, frame_buffer=None, event_log=None):
 
     @app.route("/")
     def index():
-        return HTML_TEMPLATE
+        response = Response(INDEX_BODY, mimetype="text/html")
+        # The tag is computed once below; _revalidated keeps an ETag that is already set
+        response.set_etag(INDEX_ETAG)
+        return _revalidated(response)
 
     @app.route("/stream")
     def stream():
         def generate():
+            generation = 0
+            part = None
             try:
+                yield _BOUNDARY
                 while True:
-                    frame_bytes = frame_buffer.get()
-                    if frame_bytes is not None:
-                        yield (b"--frame\r\n"
-                               b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n")
-                    fps = frame_buffer.get_fps()
-                    time.sleep(1.0 / (fps if fps > 0 else 30))
+                    # Sleeps until the capture loop publishes a frame, so each JPEG is sent once
+                    latest, frame_bytes = frame_buffer.wait_frame(generation, STREAM_KEEPALIVE)
+                    if latest != generation and frame_bytes is not None:
+                        generation = latest
+                        # One join copies the JPEG once; WSGI servers only accept bytes chunks
+                        part = b"".join((_PART_HEADER, frame_bytes, _PART_TRAILER))
+                        yield part
+                    elif part is not None:
+                        yield part
             except GeneratorExit:
                 return
 
@@ -47,7 +90,7 @@ def create_app(args, frame_buffer=None, event_log=None):
         last_motion = frame_buffer.get_last_motion_time()
         last_frame = frame_buffer.get_last_frame_time()
         roi = frame_buffer.get_roi()
-        return jsonify({
+        return _json_response({
             "sensitivity": frame_buffer.get_sensitivity(),
             "fps": frame_buffer.get_fps(),
             "night_mode": args.night_mode,
@@ -70,10 +113,7 @@ def create_app(args, frame_buffer=None, event_log=None):
             frame_buffer.set_roi(None)
             return jsonify({"roi": None})
         try:
-            x = int(data["x"])
-            y = int(data["y"])
-            w = int(data["w"])
-            h = int(data["h"])
+            x, y, w, h = (int(data[key]) for key in ("x", "y", "w", "h"))
         except (KeyError, TypeError, ValueError):
             return jsonify({"error": "ROI must include x, y, w, h as integers"}), 400
         if x < 0 or y < 0 or w <= 0 or h <= 0:
@@ -84,11 +124,7 @@ def create_app(args, frame_buffer=None, event_log=None):
 
     @app.route("/snapshots")
     def snapshots_list():
-        snapshot_dir = os.path.expanduser(args.snapshot_dir)
-        if not os.path.isdir(snapshot_dir):
-            return jsonify([])
-        files = sorted(glob.glob(os.path.join(snapshot_dir, "*.jpg")), reverse=True)
-        return jsonify([os.path.basename(f) for f in files[:20]])
+        return _revalidated(jsonify(list_snapshots(args.snapshot_dir)))
 
     @app.route("/snapshots/<filename>")
     def snapshot_file(filename):
@@ -129,13 +165,13 @@ def create_app(args, frame_buffer=None, event_log=None):
     @app.route("/events")
     def events():
         if event_log is None:
-            return jsonify([])
+            return _revalidated(_json_response([]))
         limit = request.args.get("limit", 50, type=int)
         offset = request.args.get("offset", 0, type=int)
         event_type = request.args.get("type")
         if event_type == "all":
             event_type = None
-        return jsonify(event_log.get_events(limit=limit, offset=offset, event_type=event_type))
+        return _revalidated(_json_response(event_log.get_events(limit=limit, offset=offset, event_type=event_type)))
 
     return app
 
@@ -1702,4 +1738,7 @@ streamWrap.addEventListener('touchend', function(e) {
 </body>
 </html>"""
 
-
+# The page is static, so encode it once instead of on every request. Indentation is
+# dropped on the way: the page has no <pre> blocks or multi-line JS strings it could change.
+INDEX_BODY = re.sub(r"\n\s+", "\n", HTML_TEMPLATE).encode()
+INDEX_ETAG = hashlib.sha1(INDEX_BODY).hexdigest()